@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# benchmark_devices_api.py - /api/devices (v1) vs /api/v2/devices 직렬화 크기/속도 비교
+
+import argparse
+import gzip
+import random
+import time
+
+from device_snapshot_codec import compact_snapshot, encode_v1, encode_v2_json, encode_v2_msgpack
+
+
+def make_snapshot(device_count):
+    """합성 스냅샷 생성 (실제 수집 결과와 같은 v1 필드 구성)"""
+    now = time.time()
+    devices = []
+    for i in range(device_count):
+        online = random.random() > 0.2
+        device = {
+            "name": f"Device {i}",
+            "ip": f"192.168.{i // 250}.{i % 250 + 1}",
+            "status": "online" if online else "offline",
+            "cpu": f"{random.randint(1, 99)}%" if online else "N/A",
+            "memory": f"{random.randint(1, 99)}%" if online else "N/A",
+            "disk": f"{random.randint(1, 99)}%" if online else "N/A",
+            "last_update": time.strftime("%H:%M:%S"),
+            "last_probed": now
+        }
+        if online:
+            device["rtt_ms"] = round(random.uniform(0.2, 20.0), 2)
+        devices.append(device)
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "generated_at": now,
+        "interval": 5.0,
+        "devices": devices
+    }
+
+
+def measure(encode, repeat):
+    """(1회 평균 인코딩 시간(ms), 본문 바이트, gzip 바이트)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = encode()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    return elapsed, len(body), len(gzip.compress(body, compresslevel=6, mtime=0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="디바이스 API 직렬화 벤치마크")
+    parser.add_argument("--devices", type=int, nargs="+", default=[5, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'devices':>8} {'format':<12} {'encode ms':>10} {'bytes':>10} {'gzip':>10}")
+    for count in args.devices:
+        snapshot = make_snapshot(count)
+        cases = [
+            ("v1", lambda: encode_v1(snapshot)),
+            ("v2", lambda: encode_v2_json(compact_snapshot(snapshot)))
+        ]
+        if encode_v2_msgpack(compact_snapshot(snapshot)) is not None:
+            cases.append(("v2-msgpack", lambda: encode_v2_msgpack(compact_snapshot(snapshot))))
+        for name, encode in cases:
+            elapsed, size, gzipped = measure(encode, args.repeat)
+            print(f"{count:>8} {name:<12} {elapsed:>10.3f} {size:>10} {gzipped:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# dashboard_server_core.py - 모니터링 대시보드 공용 HTTP 서버 코어 (동시 처리 + keep-alive)
+
+import email.utils
+import gzip
+import hashlib
+import http.server
+import json
+import os
+import threading
+import time
+
+try:
+    import brotli  # 선택 의존성 - 없으면 gzip만 사용
+except ImportError:
+    brotli = None
+
+# 이 크기 미만의 응답은 압축하지 않음
+MIN_COMPRESS_SIZE = 1024
+
+# Accept-Encoding 협상 시 선호 순서
+ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+def compress_variants(body, level=6):
+    """본문의 인코딩별 변형 생성 {'identity': ..., 'gzip': ..., 'br': ...}"""
+    variants = {"identity": body}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        variants["gzip"] = gzip.compress(body, compresslevel=level, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(body)
+    return variants
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding 헤더 → {인코딩: q값}"""
+    accepted = {}
+    for item in (header or "").split(","):
+        parts = [p.strip() for p in item.split(";")]
+        if not parts[0]:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[parts[0].lower()] = quality
+    return accepted
+
+
+class StaticAsset:
+    """시작 시 한 번 만들어 두는 정적 자산 (사전 압축본 + ETag/Last-Modified)
+
+    대시보드 HTML처럼 내용이 바뀌지 않는 응답은 모듈 로드 시 한 번만 생성·압축해
+    두고, send_asset이 요청마다 압축 없이 그대로 보내거나 304로 응답합니다.
+    """
+
+    def __init__(self, body, content_type, modified_at=None):
+        self.content_type = content_type
+        self.variants = compress_variants(body, level=9)
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.modified_at = int(modified_at or time.time())
+        self.last_modified = email.utils.formatdate(self.modified_at, usegmt=True)
+
+    @classmethod
+    def from_text(cls, text, content_type='text/html; charset=utf-8'):
+        return cls(text.encode(), content_type)
+
+    @classmethod
+    def from_file(cls, path, content_type='text/html; charset=utf-8'):
+        """디스크 파일로부터 생성 (Last-Modified는 파일 수정 시각)"""
+        with open(path, 'rb') as f:
+            body = f.read()
+        return cls(body, content_type, modified_at=os.path.getmtime(path))
+
+
+class DashboardHTTPServer(http.server.ThreadingHTTPServer):
+    """연결마다 데몬 스레드, 동시에 처리 중인 요청 수만 제한하는 HTTP 서버
+
+    유휴 keep-alive 연결이나 SSE 스트림은 자기 스레드에서 대기할 뿐 슬롯을
+    차지하지 않으므로, 느린 /api/devices 요청이나 열린 연결이 많아도
+    에이전트 하트비트 POST는 max_workers 슬롯 안에서 바로 처리됩니다.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    closed = False  # 장기 연결(SSE) 핸들러가 종료 여부를 확인
+
+    def __init__(self, server_address, handler_class, max_workers=32):
+        super().__init__(server_address, handler_class)
+        self.request_slots = threading.BoundedSemaphore(max_workers)
+
+    def server_close(self):
+        """소켓 정리 (데몬 스레드는 기다리지 않음)"""
+        self.closed = True
+        super().server_close()
+
+
+class DashboardRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """대시보드 공용 요청 핸들러 (HTTP/1.1 keep-alive, JSON/HTML 응답 헬퍼)"""
+
+    protocol_version = "HTTP/1.1"
+    timeout = 30  # 유휴 keep-alive 연결 스레드 정리 (슬롯은 차지하지 않음)
+    holding_slot = False
+
+    def parse_request(self):
+        """요청 줄/헤더를 받은 뒤에만 처리 슬롯 획득 (유휴 대기 중에는 미점유)"""
+        if not super().parse_request():
+            return False
+        self.server.request_slots.acquire()
+        self.holding_slot = True
+        return True
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        finally:
+            self.release_request_slot()
+
+    def release_request_slot(self):
+        """처리 슬롯 반환 - SSE처럼 오래 열린 응답은 스트림 시작 시 먼저 반환"""
+        if self.holding_slot:
+            self.holding_slot = False
+            self.server.request_slots.release()
+
+    def add_cors_headers(self):
+        """CORS 헤더 추가 (도메인 접속 지원)"""
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Credentials', 'true')
+
+    def choose_encoding(self, variants):
+        """Accept-Encoding에 맞춰 사용할 인코딩 선택"""
+        accepted = parse_accept_encoding(self.headers.get('Accept-Encoding'))
+        for encoding in ENCODING_PREFERENCE:
+            if encoding in variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return 'identity'
+
+    def is_not_modified(self, asset):
+        """조건부 요청(If-None-Match / If-Modified-Since) 검사"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or asset.etag in tags or ('W/' + asset.etag) in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return asset.modified_at <= since
+        return False
+
+    def send_asset(self, asset):
+        """사전 압축된 정적 자산 전송 (변경 없으면 304)"""
+        validators = {
+            'ETag': asset.etag,
+            'Last-Modified': asset.last_modified,
+            'Cache-Control': 'no-cache'
+        }
+        if self.is_not_modified(asset):
+            self.send_response(304)
+            for name, value in validators.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_body(asset.variants['identity'], asset.content_type,
+                       variants=asset.variants, headers=validators)
+
+    def send_body(self, body, content_type, status=200, cors=True, headers=None, variants=None):
+        """Content-Length를 포함한 응답 전송 (keep-alive 유지에 필요)
+
+        variants로 사전 압축본을 넘기면 그대로 쓰고, 없으면 큰 응답만 즉석에서 gzip 압축합니다.
+        """
+        if variants is None:
+            variants = {"identity": body}
+            if len(body) >= MIN_COMPRESS_SIZE and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                variants["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+        encoding = self.choose_encoding(variants)
+        body = variants[encoding]
+
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if len(variants) > 1:
+            self.send_header('Vary', 'Accept-Encoding')
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        if cors:
+            self.add_cors_headers()
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_json(self, data, status=200, indent=2, **kwargs):
+        """JSON 응답 전송"""
+        body = json.dumps(data, indent=indent).encode()
+        self.send_body(body, 'application/json', status=status, **kwargs)
+
+    def send_html(self, html, status=200, **kwargs):
+        """HTML 응답 전송"""
+        self.send_body(html.encode(), 'text/html; charset=utf-8', status=status, **kwargs)
+
+    def read_body(self):
+        """요청 본문 바이트 (본문이 없으면 b'')"""
+        content_length = int(self.headers.get('Content-Length', 0))
+        if content_length <= 0:
+            return b''
+        return self.rfile.read(content_length)
+
+    def read_json_body(self):
+        """요청 본문 JSON 파싱 (본문이 없으면 None)"""
+        body = self.read_body()
+        if not body:
+            return None
+        return json.loads(body.decode('utf-8'))
+
+
+def run_server(handler_class, port, host="", max_workers=32):
+    """공용 서버 코어로 대시보드 실행"""
+    with DashboardHTTPServer((host, port), handler_class, max_workers=max_workers) as httpd:
+        httpd.serve_forever()
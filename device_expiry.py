@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# device_expiry.py - 하트비트 만료 엔진 (마지막 수신 시각 기준 힙 타이머)
+
+import heapq
+import threading
+import time
+
+
+class DeviceExpiryTracker:
+    """마지막 하트비트 시각을 힙으로 관리해 만료된 디바이스를 O(log n)에 제거
+
+    하트비트마다 (만료 시각, ip, 세대) 항목을 힙에 넣고, 이전 항목은 세대 번호로
+    무효화합니다(지연 삭제). 스위퍼 스레드는 가장 이른 만료 시각까지만 대기하며,
+    만료 시 등록된 리스너에 오프라인 전환 이벤트를 전달합니다.
+    """
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+        self.heap = []          # (만료 시각, ip, 세대)
+        self.generation = {}    # ip -> 최신 세대 번호
+        self.last_seen = {}     # ip -> 마지막 하트비트 시각
+        self.listeners = []     # callback(ip, 마지막 수신 시각)
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = None
+
+    def add_listener(self, callback):
+        """만료(오프라인 전환) 이벤트 리스너 등록"""
+        self.listeners.append(callback)
+
+    def touch(self, device_ip, now=None):
+        """하트비트 수신 기록 - 만료 시각 갱신"""
+        now = now or time.time()
+        with self.condition:
+            generation = self.generation.get(device_ip, 0) + 1
+            self.generation[device_ip] = generation
+            self.last_seen[device_ip] = now
+            entry = (now + self.timeout, device_ip, generation)
+            heapq.heappush(self.heap, entry)
+            # 새 항목이 가장 이른 만료 시각이면 스위퍼를 깨워 대기 시간 재계산
+            if self.heap[0] is entry:
+                self.condition.notify()
+
+    def get_last_seen(self, device_ip):
+        with self.condition:
+            return self.last_seen.get(device_ip)
+
+    def pop_expired(self, now=None):
+        """만료된 디바이스를 제거하고 [(ip, 마지막 수신 시각)] 반환"""
+        now = now or time.time()
+        expired = []
+        with self.condition:
+            while self.heap and self.heap[0][0] <= now:
+                _, device_ip, generation = heapq.heappop(self.heap)
+                if self.generation.get(device_ip) != generation:
+                    continue  # 이후 하트비트로 무효화된 항목
+                del self.generation[device_ip]
+                expired.append((device_ip, self.last_seen.pop(device_ip)))
+        return expired
+
+    def sweep(self, now=None):
+        """만료 처리 후 리스너 호출 (락 밖에서 실행)"""
+        expired = self.pop_expired(now)
+        for device_ip, last_seen in expired:
+            for callback in self.listeners:
+                try:
+                    callback(device_ip, last_seen)
+                except Exception as e:
+                    print(f"❌ 만료 이벤트 처리 오류: {e}")
+        return expired
+
+    def run(self):
+        """가장 이른 만료 시각까지 대기하며 반복 스윕"""
+        while True:
+            with self.condition:
+                if self.stopped:
+                    break
+                wait = self.heap[0][0] - time.time() if self.heap else None
+                if wait is None or wait > 0:
+                    self.condition.wait(wait)
+                    continue
+            self.sweep()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="device-expiry", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
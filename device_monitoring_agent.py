@@ -1,21 +1,305 @@
 #!/usr/bin/env python3
 # device_monitoring_agent.py - 디바이스 모니터링 에이전트
 
+import asyncio
+import heapq
+import ipaddress
+import itertools
 import json
+import math
+import os
+import random
+import threading
 import time
+import uuid
 import subprocess
 import platform
 import socket
 import psutil
 import requests
+from array import array
+from collections import deque
 from datetime import datetime
+from urllib.parse import urlparse
+
+try:
+    import msgpack  # 선택 의존성 - 없으면 NDJSON으로 배치 전송
+except ImportError:
+    msgpack = None
+
+# 한 번의 배치 요청에 담을 최대 샘플 수
+MAX_BATCH_SAMPLES = 500
+
+# 에이전트 상태 저장 위치 (재전송 큐 등)
+AGENT_STATE_DIR = os.path.expanduser("~/.device_monitoring_agent")
+
+# 디바이스 식별자/프로필 캐시 (system_profiler 결과 재사용, TTL 지나면 백그라운드 갱신)
+PROFILE_PATH = os.path.join(AGENT_STATE_DIR, "profile.json")
+PROFILE_TTL = 86400
+
+# 로컬 IP 선택 시 뒤로 미루는 가상 인터페이스 접두사
+VIRTUAL_INTERFACE_PREFIXES = ("docker", "br-", "bridge", "veth", "utun", "vmnet", "vboxnet", "awdl", "llw", "tun", "tap")
+
+# N번째 샘플마다 전체 상태(키프레임) 전송 - 델타 유실 시에도 서버 뷰가 복구됨
+KEYFRAME_INTERVAL = 30
+
+# asyncio 모드 수집기별 주기 (초) - 느린 항목은 드물게, CPU는 자주
+COLLECTOR_CADENCES = {
+    "cpu": 2,
+    "memory": 5,
+    "io": 10,
+    "ollama": 10,
+    "disk": 60
+}
+
+# 이벤트 루프를 막을 수 있는 수집기 (스레드에서 실행)
+BLOCKING_COLLECTORS = ("disk", "ollama", "processes")
+
+# Ollama 로컬 API와 생성 통계 로그 (rag-engine/generation_stats.py가 기록)
+OLLAMA_URL = "http://127.0.0.1:11434"
+GENERATION_LOG = os.path.join(AGENT_STATE_DIR, "ollama_generations.jsonl")
+GENERATION_RATE_WINDOW = 300  # tokens/s 계산에 쓰는 최근 구간 (초)
+
+# 전송 실패 시 지수 백오프 (초)
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 300
+
+def read_or_default(read, default):
+    """권한 없는 프로세스 정보는 기본값으로 (다른 사용자 프로세스의 일부 필드는 읽을 수 없음)"""
+    try:
+        return read()
+    except psutil.AccessDenied:
+        return default
+
+class RetryQueue:
+    """전송 대기 샘플의 크기 제한 큐 (JSONL 파일에 추가 기록해 재시작 후에도 유지)
+
+    가득 차면 가장 오래된 샘플부터 버립니다. 파일은 추가 기록만 하다가
+    전송 완료 시 또는 줄 수가 2배를 넘으면 남은 샘플로 원자적으로 다시 씁니다.
+    수집(append)과 전송(head/complete)이 다른 스레드에서 호출될 수 있어 락으로 보호합니다.
+    """
+    
+    def __init__(self, path=None, maxlen=8640):
+        self.path = path
+        self.maxlen = maxlen
+        self.items = deque(maxlen=maxlen)
+        self.lock = threading.RLock()
+        self.file_lines = 0
+        self.dropped = 0
+        self.load()
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def load(self):
+        """이전 실행에서 남은 샘플 복원 (마지막 줄이 잘렸으면 무시)"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.items.append(json.loads(line))
+                    except ValueError:
+                        continue
+            self.rewrite()
+            if self.items:
+                print(f"📦 미전송 샘플 {len(self.items)}건 복원")
+        except OSError as e:
+            print(f"❌ 재전송 큐 복원 실패: {e}")
+    
+    def append(self, sample):
+        with self.lock:
+            if len(self.items) == self.maxlen:
+                self.dropped += 1
+            self.items.append(sample)
+            if not self.path:
+                return
+            if self.file_lines >= 2 * self.maxlen:
+                self.rewrite()
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(sample, separators=(',', ':')) + "\n")
+                self.file_lines += 1
+            except OSError as e:
+                print(f"❌ 재전송 큐 기록 실패: {e}")
+    
+    def head(self, count):
+        """앞에서부터 최대 count개 (제거하지 않음)"""
+        with self.lock:
+            return list(itertools.islice(self.items, count))
+    
+    def latest(self):
+        with self.lock:
+            return self.items[-1] if self.items else None
+    
+    def complete(self, samples, done):
+        """head()로 꺼낸 샘플 중 완료된 seq만 제거 (전송 중 넘쳐서 버려진 샘플은 건너뜀)"""
+        sent = {id(sample) for sample in samples}
+        with self.lock:
+            removed = set()
+            while self.items and id(self.items[0]) in sent:
+                removed.add(id(self.items.popleft()))
+            retry = [sample for sample in samples if id(sample) in removed and sample["seq"] not in done]
+            if retry:
+                # seq 순서로 되돌려 넣고, 넘치면 가장 오래된 샘플부터 버림
+                merged = sorted(itertools.chain(retry, self.items), key=lambda sample: sample["seq"])
+                overflow = max(0, len(merged) - self.maxlen)
+                self.dropped += overflow
+                self.items = deque(merged[overflow:], maxlen=self.maxlen)
+            self.rewrite()
+    
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.rewrite()
+    
+    def rewrite(self):
+        """현재 큐 내용으로 파일 교체 (비었으면 삭제, 호출자가 락 보유)"""
+        if not self.path:
+            return
+        try:
+            if not self.items:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                self.file_lines = 0
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for sample in self.items:
+                    f.write(json.dumps(sample, separators=(',', ':')) + "\n")
+            os.replace(tmp_path, self.path)
+            self.file_lines = len(self.items)
+        except OSError as e:
+            print(f"❌ 재전송 큐 저장 실패: {e}")
+
+class MetricWindow:
+    """고속 샘플링 값을 모아 두는 고정 크기 링 버퍼 (하트비트마다 요약 후 비움)"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = array('d', bytes(8 * capacity))
+        self.head = 0
+        self.size = 0
+        self.lock = threading.Lock()
+    
+    def add(self, value):
+        with self.lock:
+            self.values[self.head] = value
+            self.head = (self.head + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+    
+    def drain(self):
+        """구간 요약 {min, mean, p95, max, samples} 반환 후 비움 (샘플이 없으면 None)"""
+        with self.lock:
+            if not self.size:
+                return None
+            start = (self.head - self.size) % self.capacity
+            values = sorted(self.values[(start + i) % self.capacity] for i in range(self.size))
+            self.size = 0
+        count = len(values)
+        return {
+            "min": round(values[0], 1),
+            "mean": round(sum(values) / count, 1),
+            "p95": round(values[math.ceil(0.95 * count) - 1], 1),
+            "max": round(values[-1], 1),
+            "samples": count
+        }
+
+class TickScheduler:
+    """단조 시계 기준 고정 주기 스케줄러 (수집/전송 소요 시간이 주기에 누적되지 않음)"""
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_tick = time.monotonic()
+        self.missed = 0
+    
+    def wait(self):
+        """다음 틱까지 대기 (이미 지난 틱은 건너뛰고 다음 정각에 맞춤)"""
+        self.next_tick += self.interval
+        delay = self.next_tick - time.monotonic()
+        if delay < 0:
+            skipped = int(-delay // self.interval) + 1
+            self.missed += skipped
+            self.next_tick += skipped * self.interval
+            delay = self.next_tick - time.monotonic()
+        time.sleep(max(0.0, delay))
 
 class DeviceMonitoringAgent:
-    def __init__(self, dashboard_url="http://192.168.219.175:5004", device_name=None):
+    def __init__(self, dashboard_url="http://192.168.219.175:5004", device_name=None, buffer_size=8640,
+                 spool_path=os.path.join(AGENT_STATE_DIR, "retry_queue.jsonl"), sample_rate=4.0,
+                 ollama_url=OLLAMA_URL, top_n=5, process_interval=30, profile_path=PROFILE_PATH):
         self.dashboard_url = dashboard_url
-        self.device_name = device_name or self.get_device_name()
         self.device_ip = self.get_local_ip()
-        self.system_info = self.get_system_info()
+        
+        # 캐시된 프로필로 즉시 시작 (첫 실행만 동기 수집, 만료 시 백그라운드 갱신)
+        self.profile_path = profile_path
+        self.name_override = device_name
+        profile = self.load_profile()
+        stale = profile is not None and time.time() - profile.get("cached_at", 0) > PROFILE_TTL
+        if profile is None:
+            profile = self.refresh_profile()
+        self.device_id = profile["device_id"]
+        self.device_name = device_name or profile["device_name"]
+        self.system_info = profile["system_info"]
+        if stale:
+            self.refresh_profile_async(profile)
+        
+        # 대시보드 연결 재사용 (하트비트마다 TCP 연결을 새로 열지 않음)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # 전송 대기 샘플 큐 (연결이 끊겨도 최근 buffer_size개는 디스크에 보존 후 일괄 백필)
+        self.pending = RetryQueue(spool_path, maxlen=buffer_size)
+        self.seq = max((sample.get("seq", 0) for sample in self.pending.items), default=0)
+        self.batch_supported = True
+        self.use_msgpack = msgpack is not None
+        
+        # 재전송 백오프 / 재등록 상태
+        self.failures = 0
+        self.retry_at = 0.0
+        self.registered = False
+        
+        # 델타 하트비트 상태 (직전 샘플 메트릭, 누적 카운터 기준점)
+        self.last_metrics = {}
+        self.counter_baselines = {}  # 이름 -> (monotonic 시각, 누적 카운터)
+        self.force_keyframe = True
+        
+        # 고속 로컬 샘플링 (초당 sample_rate회, 하트비트마다 min/mean/p95/max 요약)
+        self.sample_rate = sample_rate
+        self.windows = {}
+        
+        # Ollama 수집기 (빈 URL이면 비활성, 프로세스 객체는 캐시해 매번 전체 탐색하지 않음)
+        self.ollama_url = ollama_url
+        self.ollama_session = requests.Session()
+        self.ollama_procs = []
+        self.ollama_scanned_at = 0.0
+        
+        # 프로세스 상위 N개 (pid -> [Process, 이름] 캐시, process_interval초마다 스캔, 0이면 비활성)
+        self.top_n = top_n
+        self.process_interval = process_interval
+        self.process_cache = {}
+        self.processes_scanned_at = None
+        self.top_processes = {}  # 직전 스캔 결과 (스캔 사이 틱과 키프레임에 그대로 포함)
+        
+        # 에이전트 자체 카운터
+        self.stats = {
+            "samples": 0,
+            "sent": 0,
+            "requests": 0,
+            "failures": 0,
+            "retries": 0,
+            "registrations": 0
+        }
+        
+        # cpu_percent(interval=None)는 직전 호출 대비 값을 돌려주므로 기준점을 미리 잡아 둠
+        self.prime_cpu_counters()
         
         print(f"🖥️  디바이스 모니터링 에이전트 시작")
         print(f"📱 디바이스명: {self.device_name}")
@@ -46,17 +330,80 @@ class DeviceMonitoringAgent:
         
         return f"{hostname} ({system})"
     
+    def load_profile(self):
+        """캐시된 프로필 로드 (없거나 손상되면 None)"""
+        if not self.profile_path:
+            return None
+        try:
+            with open(self.profile_path, encoding="utf-8") as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not all(key in profile for key in ("device_id", "device_name", "system_info")):
+            return None
+        return profile
+    
+    def save_profile(self, profile):
+        """프로필 원자적 저장"""
+        if not self.profile_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.profile_path) or ".", exist_ok=True)
+            tmp_path = self.profile_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(profile, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.profile_path)
+        except OSError as e:
+            print(f"❌ 프로필 저장 실패: {e}")
+    
+    def refresh_profile(self, previous=None):
+        """디바이스 이름(system_profiler)/시스템 정보 수집 후 캐시 (디바이스 ID는 유지)"""
+        profile = {
+            "device_id": (previous or {}).get("device_id") or uuid.uuid4().hex,
+            "device_name": self.get_device_name(),
+            "system_info": self.get_system_info(),
+            "cached_at": time.time()
+        }
+        self.save_profile(profile)
+        return profile
+    
+    def refresh_profile_async(self, previous):
+        """만료된 프로필을 백그라운드에서 갱신 (바뀌었으면 다음 전송 전에 재등록)"""
+        def worker():
+            profile = self.refresh_profile(previous)
+            device_name = self.name_override or profile["device_name"]
+            if device_name != self.device_name or profile["system_info"] != self.system_info:
+                self.device_name = device_name
+                self.system_info = profile["system_info"]
+                self.registered = False
+        
+        threading.Thread(target=worker, name="profile-refresh", daemon=True).start()
+    
     def get_local_ip(self):
-        """로컬 IP 주소 조회"""
+        """로컬 IP 주소 조회 (인터페이스 열거 - 외부 경로/네트워크 연결 불필요)
+
+        활성 인터페이스의 IPv4 중 루프백/링크 로컬을 제외하고, 가상 인터페이스보다
+        물리 인터페이스를, 공인 주소보다 사설 주소를 우선합니다.
+        """
         try:
-            # 외부 연결을 통해 로컬 IP 확인
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except:
-            return "127.0.0.1"
+            stats = psutil.net_if_stats()
+            candidates = []
+            for name, addrs in psutil.net_if_addrs().items():
+                if name in stats and not stats[name].isup:
+                    continue
+                for addr in addrs:
+                    if addr.family != socket.AF_INET:
+                        continue
+                    ip = ipaddress.ip_address(addr.address)
+                    if ip.is_loopback or ip.is_link_local:
+                        continue
+                    virtual = name.lower().startswith(VIRTUAL_INTERFACE_PREFIXES)
+                    candidates.append((virtual, not ip.is_private, name, addr.address))
+            if candidates:
+                return min(candidates)[3]
+        except Exception as e:
+            print(f"❌ 로컬 IP 조회 실패: {e}")
+        return "127.0.0.1"
     
     def get_system_info(self):
         """시스템 정보 수집"""
@@ -80,16 +427,54 @@ class DeviceMonitoringAgent:
             print(f"❌ 시스템 정보 수집 실패: {e}")
             return {}
     
+    def prime_cpu_counters(self):
+        """비차단 CPU 측정의 기준점 설정 (첫 샘플이 0%가 되지 않도록)"""
+        try:
+            psutil.cpu_percent(interval=None)
+            psutil.cpu_percent(interval=None, percpu=True)
+        except Exception as e:
+            print(f"❌ CPU 카운터 초기화 실패: {e}")
+    
     def get_cpu_usage(self):
-        """CPU 사용률 조회"""
+        """CPU 사용률 조회 (직전 샘플 이후 구간, 대기 없음)"""
         try:
-            # 1초 간격으로 CPU 사용률 측정
-            cpu_percent = psutil.cpu_percent(interval=1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             return f"{cpu_percent:.0f}%"
         except Exception as e:
             print(f"❌ CPU 사용률 조회 실패: {e}")
             return "0%"
     
+    def get_cpu_per_core(self):
+        """코어별 CPU 사용률 (직전 샘플 이후 구간)"""
+        try:
+            return [round(value, 1) for value in psutil.cpu_percent(interval=None, percpu=True)]
+        except Exception as e:
+            print(f"❌ 코어별 CPU 조회 실패: {e}")
+            return []
+    
+    def get_load_average(self):
+        """1/5/15분 load average"""
+        try:
+            return [round(value, 2) for value in psutil.getloadavg()]
+        except (AttributeError, OSError):
+            return []
+    
+    def get_disk_io(self):
+        """디스크 I/O 누적 카운터"""
+        try:
+            disk_io = psutil.disk_io_counters()
+            if disk_io is None:
+                return {}
+            return {
+                "read_bytes": disk_io.read_bytes,
+                "write_bytes": disk_io.write_bytes,
+                "read_count": disk_io.read_count,
+                "write_count": disk_io.write_count
+            }
+        except Exception as e:
+            print(f"❌ 디스크 I/O 조회 실패: {e}")
+            return {}
+    
     def get_memory_usage(self):
         """메모리 사용률 조회"""
         try:
@@ -122,40 +507,314 @@ class DeviceMonitoringAgent:
             print(f"❌ 네트워크 정보 조회 실패: {e}")
             return {}
     
+    def get_rates(self, name, counters, now):
+        """누적 카운터 → 직전 샘플 대비 초당 변화량 (첫 샘플은 빈 dict)"""
+        previous = self.counter_baselines.get(name)
+        self.counter_baselines[name] = (now, counters)
+        if previous is None or not counters:
+            return {}
+        elapsed = now - previous[0]
+        if elapsed <= 0:
+            return {}
+        return {
+            f"{key}_per_s": round(max(0, value - previous[1].get(key, value)) / elapsed)
+            for key, value in counters.items()
+        }
+    
+    def collect_cpu(self):
+        """CPU 수집기 (전체/코어별 사용률, load average)"""
+        metrics = {
+            "cpu_per_core": self.get_cpu_per_core(),
+            "load_avg": self.get_load_average()
+        }
+        if not self.windows:
+            # 고속 샘플링 중에는 전체 CPU를 구간 요약으로 보고 (cpu_percent 기준점을 공유하므로 여기서 읽지 않음)
+            metrics["cpu"] = self.get_cpu_usage()
+        return metrics
+    
+    def collect_memory(self):
+        """메모리 수집기"""
+        return {"memory": self.get_memory_usage()}
+    
+    def collect_disk(self):
+        """디스크 사용률 수집기"""
+        return {"disk": self.get_disk_usage()}
+    
+    def collect_io(self):
+        """네트워크/디스크 I/O 처리량 수집기 (직전 수집 대비 초당 변화량)"""
+        now = time.monotonic()
+        return {
+            "network": self.get_rates("network", self.get_network_info(), now),
+            "disk_io": self.get_rates("disk_io", self.get_disk_io(), now)
+        }
+    
+    def get_ollama_models(self):
+        """로드된 모델 목록 (/api/ps) - Ollama가 꺼져 있으면 None"""
+        try:
+            response = self.ollama_session.get(f"{self.ollama_url}/api/ps", timeout=1)
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
+            return None
+        models = []
+        for model in response.json().get("models", []):
+            models.append({
+                "name": model.get("name"),
+                "size_mb": round(model.get("size", 0) / (1024**2)),
+                "vram_mb": round(model.get("size_vram", 0) / (1024**2)),
+                "expires_at": model.get("expires_at")
+            })
+        return models
+    
+    def get_ollama_processes(self):
+        """ollama 서버/러너 프로세스 (캐시된 객체가 종료됐거나 60초가 지나면 재탐색)"""
+        now = time.monotonic()
+        alive = [proc for proc in self.ollama_procs if proc.is_running()]
+        if len(alive) != len(self.ollama_procs) or not alive or now - self.ollama_scanned_at > 60:
+            alive = [proc for proc in psutil.process_iter(['name'])
+                     if 'ollama' in (proc.info['name'] or '').lower()]
+            self.ollama_scanned_at = now
+        self.ollama_procs = alive
+        return alive
+    
+    def get_ollama_connections(self, procs):
+        """Ollama API 포트에 연결된 클라이언트 수 (진행 중 요청의 근사치)"""
+        port = urlparse(self.ollama_url).port or 11434
+        count = 0
+        for proc in procs:
+            try:
+                if hasattr(proc, "net_connections"):
+                    connections = proc.net_connections(kind="tcp")
+                else:
+                    connections = proc.connections(kind="tcp")
+            except (psutil.AccessDenied, psutil.NoSuchProcess):
+                continue
+            count += sum(1 for conn in connections
+                         if conn.status == psutil.CONN_ESTABLISHED and conn.laddr and conn.laddr.port == port)
+        return count
+    
+    def get_generation_rate(self, path=GENERATION_LOG):
+        """최근 생성 기록으로 tokens/s 계산 (기록이 없으면 None)"""
+        try:
+            with open(path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 65536))  # 로그 끝부분만 읽음
+                lines = f.read().decode("utf-8", "ignore").splitlines()
+        except OSError:
+            return None
+        since = time.time() - GENERATION_RATE_WINDOW
+        tokens = 0
+        duration_ns = 0
+        generations = 0
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("ts", 0) < since:
+                continue
+            tokens += entry.get("eval_count", 0)
+            duration_ns += entry.get("eval_duration", 0)
+            generations += 1
+        if not duration_ns:
+            return None
+        return {"tokens_per_s": round(tokens / (duration_ns / 1e9), 1), "generations": generations}
+    
+    def collect_ollama(self):
+        """Ollama 수집기 (로드된 모델, 프로세스 RSS, 연결 수, 최근 tokens/s)"""
+        if not self.ollama_url:
+            return {}
+        models = self.get_ollama_models()
+        if models is None:
+            return {"ollama": {"running": False}}
+        
+        procs = self.get_ollama_processes()
+        rss = 0
+        for proc in procs:
+            try:
+                rss += proc.memory_info().rss
+            except (psutil.AccessDenied, psutil.NoSuchProcess):
+                continue
+        return {"ollama": {
+            "running": True,
+            "models": models,
+            "rss_mb": round(rss / (1024**2)),
+            "active_connections": self.get_ollama_connections(procs),
+            "generation": self.get_generation_rate()
+        }}
+    
+    def scan_processes(self):
+        """프로세스 테이블 스캔 → [(cpu%, rss, pid, 이름)]
+
+        Process 객체를 pid별로 캐시해 cpu_percent가 직전 스캔 대비 값을 돌려주게 하고,
+        oneshot()으로 프로세스당 시스템 호출을 묶습니다. 새 프로세스는 첫 스캔에서 0%입니다.
+        """
+        pids = set(psutil.pids())
+        for pid in list(self.process_cache):
+            if pid not in pids:
+                del self.process_cache[pid]
+        
+        rows = []
+        for pid in pids:
+            entry = self.process_cache.get(pid)
+            try:
+                if entry is None:
+                    proc = psutil.Process(pid)
+                    entry = self.process_cache[pid] = [proc, None]
+                proc = entry[0]
+                with proc.oneshot():
+                    if entry[1] is None:
+                        entry[1] = read_or_default(proc.name, None)
+                    cpu = read_or_default(lambda: proc.cpu_percent(interval=None), 0.0)
+                    rss = read_or_default(lambda: proc.memory_info().rss, 0)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self.process_cache.pop(pid, None)
+                continue
+            rows.append((cpu, rss, pid, entry[1] or f"pid {pid}"))
+        return rows
+    
+    def collect_processes(self):
+        """동기 모드용 - process_interval이 지났을 때만 다시 스캔, 그 사이에는 직전 결과
+
+        매 틱 같은 값을 넣어 두면 델타에서는 변경 없음으로 빠지고,
+        키프레임(full)과 단건 전송의 전체 하트비트에는 그대로 포함됩니다.
+        """
+        if self.top_n <= 0 or self.process_interval <= 0:
+            return {}
+        now = time.monotonic()
+        if self.processes_scanned_at is None or now - self.processes_scanned_at >= self.process_interval:
+            self.processes_scanned_at = now
+            self.top_processes = self.collect_top_processes()
+        return self.top_processes
+    
+    def collect_top_processes(self):
+        """CPU/메모리 상위 N개 프로세스 수집기"""
+        rows = self.scan_processes()
+        
+        def describe(row):
+            cpu, rss, pid, name = row
+            return {"pid": pid, "name": name, "cpu": round(cpu, 1), "rss_mb": round(rss / (1024**2))}
+        
+        return {"top_processes": {
+            "cpu": [describe(row) for row in heapq.nlargest(self.top_n, rows, key=lambda row: row[0])],
+            "memory": [describe(row) for row in heapq.nlargest(self.top_n, rows, key=lambda row: row[1])]
+        }}
+    
     def collect_monitoring_data(self):
-        """모니터링 데이터 수집"""
+        """모니터링 데이터 수집 (한 틱에 모든 카운터를 비차단으로 읽어 델타 하트비트 생성)"""
         try:
-            data = {
-                "device_name": self.device_name,
-                "ip": self.device_ip,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "cpu": self.get_cpu_usage(),
-                "memory": self.get_memory_usage(),
-                "disk": self.get_disk_usage(),
-                "network": self.get_network_info(),
-                "system_info": self.system_info,
-                "status": "online"
-            }
-            
-            return data
+            started = time.perf_counter()
+            metrics = {}
+            for collect in (self.collect_cpu, self.collect_memory, self.collect_disk, self.collect_io,
+                            self.collect_ollama, self.collect_processes):
+                metrics.update(collect())
+            metrics["status"] = "online"
+            self.stats["collect_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            return self.build_sample(metrics)
         except Exception as e:
             print(f"❌ 모니터링 데이터 수집 실패: {e}")
             return None
     
+    def start_sampling(self, interval):
+        """고속 샘플링 버퍼 준비 (하트비트 간격 2배 분량, sample_rate가 0이면 비활성)"""
+        if self.sample_rate <= 0:
+            return False
+        capacity = int(self.sample_rate * interval * 2) + 1
+        self.windows = {"cpu": MetricWindow(capacity), "memory": MetricWindow(capacity)}
+        return True
+    
+    def sample_fast(self):
+        """CPU/메모리 순간값 한 건 기록 (비차단, 수십 µs)"""
+        self.windows["cpu"].add(psutil.cpu_percent(interval=None))
+        self.windows["memory"].add(psutil.virtual_memory().percent)
+    
+    def run_sampler(self):
+        """고속 샘플링 스레드 (동기 모드)"""
+        scheduler = TickScheduler(1.0 / self.sample_rate)
+        while True:
+            try:
+                self.sample_fast()
+            except Exception as e:
+                print(f"❌ 고속 샘플링 실패: {e}")
+            scheduler.wait()
+    
+    def summarize_windows(self, metrics):
+        """구간 요약을 하트비트에 반영 (cpu/memory 값은 구간 평균, *_stats에 분포)"""
+        for name, window in self.windows.items():
+            summary = window.drain()
+            if summary is None:
+                continue
+            metrics[name] = f"{summary['mean']:.0f}%"
+            metrics[f"{name}_stats"] = summary
+        if "cpu" not in metrics:
+            metrics["cpu"] = self.get_cpu_usage()  # 첫 틱처럼 아직 샘플이 없을 때
+    
+    def build_sample(self, metrics):
+        """수집된 메트릭으로 다음 seq의 하트비트 생성"""
+        self.summarize_windows(metrics)
+        self.seq += 1
+        self.stats["samples"] += 1
+        return self.encode_delta(metrics)
+    
+    def encode_delta(self, metrics):
+        """직전 샘플 대비 바뀐 필드만 담은 하트비트 (키프레임은 전체 + 에이전트 카운터)"""
+        keyframe = self.force_keyframe or self.seq % KEYFRAME_INTERVAL == 0
+        if keyframe:
+            data = dict(metrics, full=True, agent_stats=self.get_stats())
+        else:
+            data = {key: value for key, value in metrics.items() if self.last_metrics.get(key) != value}
+        self.last_metrics = metrics
+        self.force_keyframe = False
+        
+        data["ip"] = self.device_ip
+        data["seq"] = self.seq
+        data["sampled_at"] = time.time()
+        data["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return data
+    
+    def full_sample(self, sample):
+        """단건 전송용 전체 하트비트 (최신 샘플 메타데이터 + 전체 메트릭)"""
+        return dict(self.last_metrics, device_name=self.device_name, full=True,
+                    ip=sample["ip"], seq=sample["seq"],
+                    sampled_at=sample["sampled_at"], timestamp=sample["timestamp"])
+    
+    def get_stats(self):
+        """에이전트 카운터 스냅샷 (큐 길이/버린 샘플 수 포함)"""
+        stats = dict(self.stats)
+        stats["queued"] = len(self.pending)
+        stats["dropped"] = self.pending.dropped
+        return stats
+    
+    def post(self, path, **kwargs):
+        """공유 세션으로 POST (요청/실패 카운터 갱신)"""
+        self.stats["requests"] += 1
+        try:
+            return self.session.post(f"{self.dashboard_url}{path}", **kwargs)
+        except requests.exceptions.RequestException:
+            self.stats["failures"] += 1
+            raise
+    
+    def check_registration(self, response):
+        """서버가 이 디바이스를 모르면 다음 전송 전에 재등록하고 다음 샘플은 전체 상태로 전송"""
+        try:
+            if response.json().get("registration_required"):
+                self.registered = False
+                self.force_keyframe = True
+        except ValueError:
+            pass
+    
     def send_heartbeat(self, data):
         """대시보드로 하트비트 전송"""
         try:
-            response = requests.post(
-                f"{self.dashboard_url}/api/heartbeat",
-                json=data,
-                timeout=5
-            )
+            response = self.post("/api/heartbeat", json=data, timeout=5)
             
             if response.status_code == 200:
                 print(f"✅ 하트비트 전송 성공: {data['timestamp']}")
+                self.stats["sent"] += 1
+                self.check_registration(response)
                 return True
             else:
                 print(f"❌ 하트비트 전송 실패: {response.status_code}")
+                self.stats["failures"] += 1
                 return False
                 
         except requests.exceptions.RequestException as e:
@@ -165,24 +824,120 @@ class DeviceMonitoringAgent:
             print(f"❌ 하트비트 전송 오류: {e}")
             return False
     
+    def encode_batch(self, samples):
+        """배치 본문 인코딩 → (본문, Content-Type)"""
+        if self.use_msgpack:
+            return msgpack.packb(samples, use_bin_type=True), "application/msgpack"
+        body = "\n".join(json.dumps(sample, separators=(',', ':')) for sample in samples)
+        return body.encode(), "application/x-ndjson"
+    
+    def send_batch(self, samples):
+        """배치 하트비트 전송 → 처리 완료(ok/rejected)된 seq 집합 (실패 시 None)"""
+        body, content_type = self.encode_batch(samples)
+        try:
+            response = self.post(
+                "/api/heartbeat/batch",
+                data=body,
+                headers={"Content-Type": content_type},
+                timeout=10
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"❌ 대시보드 연결 실패: {e}")
+            return None
+        
+        if response.status_code == 404:
+            # 배치 엔드포인트가 없는 구버전 서버 - 단건 하트비트로 전환
+            print("⚠️  배치 하트비트 미지원 서버 - 단건 전송으로 전환")
+            self.batch_supported = False
+            return None
+        if response.status_code == 415 and self.use_msgpack:
+            # 서버에 msgpack이 없으면 NDJSON으로 재전송
+            self.use_msgpack = False
+            return self.send_batch(samples)
+        if response.status_code != 200:
+            print(f"❌ 배치 하트비트 전송 실패: {response.status_code}")
+            self.stats["failures"] += 1
+            return None
+        
+        self.check_registration(response)
+        done = set()
+        for ack in response.json().get("acks", []):
+            if ack.get("status") == "rejected":
+                print(f"⚠️  샘플 거부됨 (seq {ack.get('seq')}): {ack.get('error')}")
+            done.add(ack.get("seq"))
+        return done
+    
+    def schedule_retry(self):
+        """연속 실패 횟수에 따른 지수 백오프 + 지터로 다음 전송 시각 결정"""
+        self.failures += 1
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (self.failures - 1))
+        delay = random.uniform(delay / 2, delay)  # 여러 에이전트가 동시에 몰리지 않도록
+        self.retry_at = time.monotonic() + delay
+        print(f"⏳ {delay:.0f}초 후 재전송 (연속 실패 {self.failures}회, 대기 {len(self.pending)}건)")
+    
+    def flush_pending(self):
+        """큐의 샘플을 배치로 전송 (ack된 샘플만 제거, 실패 시 백오프 후 재시도)"""
+        if time.monotonic() < self.retry_at:
+            return False  # 백오프 중 - 샘플은 큐에 계속 쌓임
+        if self.failures:
+            self.stats["retries"] += 1
+        if not self.registered and not self.register_device():
+            self.schedule_retry()
+            return False
+        
+        if not self.batch_supported:
+            latest = self.pending.latest()
+            if latest is None:
+                return False
+            # 단건 전송은 최신 상태만 의미가 있으므로 델타 대신 전체 상태 전송
+            if not self.send_heartbeat(self.full_sample(latest)):
+                self.schedule_retry()
+                return False
+            self.pending.clear()
+            self.failures = 0
+            return True
+        
+        sent = 0
+        while self.pending:
+            samples = self.pending.head(MAX_BATCH_SAMPLES)
+            done = self.send_batch(samples)
+            if done is None:
+                if not self.batch_supported:
+                    return self.flush_pending()
+                self.schedule_retry()
+                break
+            # 배치는 큐 앞부분이므로 한꺼번에 꺼내고 ack되지 않은 샘플만 되돌림
+            self.pending.complete(samples, done)
+            sent += len(done)
+            self.stats["sent"] += len(done)
+            self.failures = 0
+            if not done:
+                break
+        
+        if sent > 1:
+            print(f"✅ 하트비트 {sent}건 일괄 전송 (미전송 {len(self.pending)}건)")
+        elif sent == 1:
+            print(f"✅ 하트비트 전송 성공: {samples[-1]['timestamp']}")
+        return not self.pending
+    
     def register_device(self):
         """디바이스 등록"""
         try:
             registration_data = {
                 "name": self.device_name,
                 "ip": self.device_ip,
+                "device_id": self.device_id,
                 "system_info": self.system_info,
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            response = requests.post(
-                f"{self.dashboard_url}/api/register",
-                json=registration_data,
-                timeout=5
-            )
+            response = self.post("/api/register", json=registration_data, timeout=5)
             
             if response.status_code == 200:
                 print(f"✅ 디바이스 등록 성공")
+                self.registered = True
+                self.force_keyframe = True  # 서버가 새 기준 상태를 갖도록 다음 샘플은 전체 전송
+                self.stats["registrations"] += 1
                 return True
             else:
                 print(f"❌ 디바이스 등록 실패: {response.status_code}")
@@ -196,31 +951,112 @@ class DeviceMonitoringAgent:
         """모니터링 에이전트 실행"""
         print(f"🚀 모니터링 에이전트 시작 (간격: {interval}초)")
         
-        # 디바이스 등록 시도
+        # 디바이스 등록 시도 (실패하면 첫 전송 때 백오프와 함께 재시도)
         self.register_device()
         
+        if self.start_sampling(interval):
+            threading.Thread(target=self.run_sampler, name="fast-sampler", daemon=True).start()
+        
+        scheduler = TickScheduler(interval)
         try:
             while True:
                 # 모니터링 데이터 수집
                 data = self.collect_monitoring_data()
                 
                 if data:
-                    # 대시보드로 전송
-                    success = self.send_heartbeat(data)
+                    # 버퍼에 쌓은 뒤 대기 중인 샘플과 함께 일괄 전송
+                    self.pending.append(data)
+                    success = self.flush_pending()
                     
                     if success:
-                        print(f"📊 CPU: {data['cpu']}, 메모리: {data['memory']}, 디스크: {data['disk']}")
+                        metrics = self.last_metrics
+                        print(f"📊 CPU: {metrics['cpu']}, 메모리: {metrics['memory']}, 디스크: {metrics['disk']}")
                     else:
-                        print(f"⚠️  대시보드 연결 실패 - 재시도 중...")
+                        print(f"⚠️  대시보드 연결 실패 - {len(self.pending)}건 버퍼링, 재시도 중...")
                 
-                # 대기
-                time.sleep(interval)
+                # 다음 틱까지 대기 (수집·전송 시간만큼 주기가 밀리지 않음)
+                scheduler.wait()
                 
         except KeyboardInterrupt:
-            print(f"\n🛑 모니터링 에이전트 종료")
+            print(f"\n🛑 모니터링 에이전트 종료 - {self.get_stats()}")
         except Exception as e:
             print(f"❌ 에이전트 실행 오류: {e}")
 
+    async def run_collector(self, name, collect, cadence, latest):
+        """수집기 하나를 자체 주기로 반복 실행 (이벤트 루프 단조 시계 기준, 밀린 주기는 건너뜀)"""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            try:
+                # 디스크(네트워크 볼륨)/HTTP 조회는 멈출 수 있어 스레드에서 실행
+                if name in BLOCKING_COLLECTORS:
+                    result = await asyncio.to_thread(collect)
+                else:
+                    result = collect()
+                if result:
+                    latest.update(result)
+            except Exception as e:
+                print(f"❌ {name} 수집 실패: {e}")
+            next_tick = max(next_tick + cadence, loop.time())
+            await asyncio.sleep(next_tick - loop.time())
+    
+    async def run_publisher(self, interval, latest, flush_wanted):
+        """interval마다 최신 메트릭으로 샘플을 만들어 큐에 적재 (전송을 기다리지 않음)"""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + interval
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            next_tick = max(next_tick + interval, loop.time())
+            self.pending.append(self.build_sample(dict(latest, status="online")))
+            flush_wanted.set()
+    
+    async def run_sender(self, flush_wanted):
+        """큐를 배치로 전송 (HTTP는 스레드에서 수행해 수집기를 막지 않음)"""
+        while True:
+            await flush_wanted.wait()
+            flush_wanted.clear()
+            success = await asyncio.to_thread(self.flush_pending)
+            if success:
+                metrics = self.last_metrics
+                print(f"📊 CPU: {metrics['cpu']}, 메모리: {metrics['memory']}, 디스크: {metrics['disk']}")
+            elif self.pending:
+                print(f"⚠️  대시보드 연결 실패 - {len(self.pending)}건 버퍼링, 재시도 중...")
+    
+    async def run_async(self, interval=10):
+        """asyncio 모드 - 수집기별 독립 주기 + 공용 발행/전송 태스크"""
+        print(f"🚀 모니터링 에이전트 시작 (asyncio 모드, 발행 간격: {interval}초)")
+        
+        # 등록(정적 시스템 정보 전송)은 시작 시 한 번만 - 이벤트 루프를 막지 않도록 스레드에서
+        await asyncio.to_thread(self.register_device)
+        
+        latest = {}
+        flush_wanted = asyncio.Event()
+        collectors = {
+            "cpu": self.collect_cpu,
+            "memory": self.collect_memory,
+            "io": self.collect_io,
+            "ollama": self.collect_ollama,
+            "disk": self.collect_disk
+        }
+        cadences = dict(COLLECTOR_CADENCES)
+        if self.top_n > 0 and self.process_interval > 0:
+            collectors["processes"] = self.collect_top_processes
+            cadences["processes"] = self.process_interval
+        if self.start_sampling(interval):
+            collectors["sampler"] = self.sample_fast
+            cadences["sampler"] = 1.0 / self.sample_rate
+        tasks = [
+            asyncio.create_task(self.run_collector(name, collect, cadences[name], latest))
+            for name, collect in collectors.items()
+        ]
+        tasks.append(asyncio.create_task(self.run_publisher(interval, latest, flush_wanted)))
+        tasks.append(asyncio.create_task(self.run_sender(flush_wanted)))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
 def main():
     """메인 함수"""
     import argparse
@@ -231,6 +1067,22 @@ def main():
     parser.add_argument("--name", help="디바이스 이름 (자동 감지)")
     parser.add_argument("--interval", type=int, default=10, 
                        help="모니터링 간격 (초)")
+    parser.add_argument("--buffer-size", type=int, default=8640,
+                       help="연결 끊김 시 보관할 최대 샘플 수")
+    parser.add_argument("--sample-rate", type=float, default=4.0,
+                       help="로컬 고속 샘플링 빈도 (Hz, 0이면 비활성)")
+    parser.add_argument("--ollama-url", default=OLLAMA_URL,
+                       help="Ollama API 주소 (빈 값이면 수집 안 함)")
+    parser.add_argument("--top-n", type=int, default=5,
+                       help="하트비트에 담을 CPU/메모리 상위 프로세스 수 (0이면 비활성)")
+    parser.add_argument("--process-interval", type=float, default=30,
+                       help="프로세스 테이블 스캔 간격 (초)")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                       help="asyncio 모드 (수집기별 독립 주기, 전송 지연이 수집을 막지 않음)")
+    parser.add_argument("--spool", default=os.path.join(AGENT_STATE_DIR, "retry_queue.jsonl"),
+                       help="미전송 샘플 저장 파일")
+    parser.add_argument("--profile", default=PROFILE_PATH,
+                       help="디바이스 ID/프로필 캐시 파일")
     
     args = parser.parse_args()
     
@@ -245,10 +1097,23 @@ def main():
     # 에이전트 시작
     agent = DeviceMonitoringAgent(
         dashboard_url=args.dashboard,
-        device_name=args.name
+        device_name=args.name,
+        buffer_size=args.buffer_size,
+        spool_path=args.spool,
+        sample_rate=args.sample_rate,
+        ollama_url=args.ollama_url,
+        top_n=args.top_n,
+        process_interval=args.process_interval,
+        profile_path=args.profile
     )
     
-    agent.run(interval=args.interval)
+    if args.use_async:
+        try:
+            asyncio.run(agent.run_async(interval=args.interval))
+        except KeyboardInterrupt:
+            print(f"\n🛑 모니터링 에이전트 종료 - {agent.get_stats()}")
+    else:
+        agent.run(interval=args.interval)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# device_snapshot_codec.py - 디바이스 스냅샷 직렬화 (v1 호환 JSON / v2 압축 숫자 포맷)
+
+import json
+
+from metrics_history import parse_metric_value
+
+try:
+    import msgpack  # 선택 의존성 - 없으면 v2 JSON만 제공
+except ImportError:
+    msgpack = None
+
+V2_METRICS = ("cpu", "memory", "disk")
+
+
+def compact_snapshot(snapshot):
+    """v1 스냅샷 → v2 구조 (문자열 '45%' 대신 숫자, 표시용 문자열 제거)"""
+    devices = []
+    for device in snapshot["devices"]:
+        entry = {
+            "name": device["name"],
+            "ip": device["ip"],
+            "status": device["status"],
+            "last_probed": device.get("last_probed")
+        }
+        for metric in V2_METRICS:
+            entry[metric] = parse_metric_value(device.get(metric))
+        for key in ("rtt_ms", "stale_after", "cpu_stats", "memory_stats", "ollama", "top_processes"):
+            if key in device:
+                entry[key] = device[key]
+        devices.append(entry)
+    return {
+        "version": 2,
+        "generated_at": snapshot["generated_at"],
+        "interval": snapshot["interval"],
+        "devices": devices
+    }
+
+
+def encode_v1(snapshot):
+    """기존 /api/devices 응답 (들여쓰기 JSON)"""
+    return json.dumps(snapshot, indent=2).encode()
+
+
+def encode_v2_json(compact):
+    """v2 JSON (공백 없는 구분자)"""
+    return json.dumps(compact, separators=(',', ':')).encode()
+
+
+def encode_v2_msgpack(compact):
+    """v2 MessagePack (msgpack 미설치 시 None)"""
+    if msgpack is None:
+        return None
+    return msgpack.packb(compact, use_bin_type=True)
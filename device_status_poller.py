@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# device_status_poller.py - 백그라운드 디바이스 상태 수집기 (공유 스냅샷 캐시)
+
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+from dashboard_server_core import compress_variants
+from device_snapshot_codec import compact_snapshot, encode_v1, encode_v2_json, encode_v2_msgpack
+from event_stream import format_event
+
+
+class DeviceStatusPoller:
+    """단일 백그라운드 스레드가 주기적으로 디바이스 상태를 수집해 스냅샷으로 보관
+
+    HTTP 핸들러는 수집을 직접 하지 않고 미리 직렬화된 JSON 바이트를 그대로
+    돌려주므로, 대시보드 탭이 몇 개 열려 있어도 ping/ssh 부하는 하나뿐입니다.
+    """
+
+    def __init__(self, collect, interval=5.0):
+        self.collect = collect          # 디바이스 상태 리스트를 반환하는 함수
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.listeners = []             # 스냅샷 교체 시 호출: callback(이전 스냅샷, 새 스냅샷)
+        self.last_probed = {}           # ip -> 마지막으로 실제 응답을 받은 시각 (epoch)
+        self.generated_at = 0.0
+        self.snapshot = {"timestamp": None, "generated_at": 0.0, "interval": interval, "devices": []}
+        self.encoded = self.encode(self.snapshot)  # 포맷 -> (본문, 인코딩별 압축본)
+
+    def start(self):
+        """수집 스레드 시작 (첫 스냅샷은 동기적으로 생성)"""
+        self.refresh()
+        self.thread = threading.Thread(target=self.run, name="device-status-poller", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """수집 스레드 종료"""
+        self.stopped.set()
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=self.interval)
+
+    def add_listener(self, callback):
+        """스냅샷 변경 알림 등록 (예: SSE 브로드캐스터)"""
+        self.listeners.append(callback)
+
+    def trigger(self):
+        """다음 주기를 기다리지 않고 즉시 갱신 요청 (예: 하트비트 수신 시)"""
+        self.wakeup.set()
+
+    def run(self):
+        """고정 주기 수집 루프"""
+        while not self.stopped.is_set():
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            if self.stopped.is_set():
+                break
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ 디바이스 상태 수집 오류: {e}")
+
+    def refresh(self):
+        """상태를 수집하고 스냅샷/직렬화 결과를 교체"""
+        devices = self.collect()
+        now = time.time()
+
+        for device in devices:
+            if device.get("last_probed") is not None:
+                # 하트비트 기반 디바이스는 수집기가 실제 수신 시각을 넘겨줌
+                self.last_probed[device["ip"]] = device["last_probed"]
+            elif device.get("status") != "checking":
+                self.last_probed[device["ip"]] = now
+            device["last_probed"] = self.last_probed.get(device["ip"])
+
+        snapshot = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "generated_at": now,
+            "interval": self.interval,
+            "devices": devices
+        }
+        encoded = self.encode(snapshot)
+
+        with self.lock:
+            previous = self.snapshot
+            self.snapshot = snapshot
+            self.encoded = encoded
+            self.generated_at = now
+
+        for callback in self.listeners:
+            try:
+                callback(previous, snapshot)
+            except Exception as e:
+                print(f"❌ 스냅샷 알림 오류: {e}")
+
+    def encode(self, snapshot):
+        """응답 포맷별 직렬화/압축을 스냅샷 단위로 한 번만 수행"""
+        compact = compact_snapshot(snapshot)
+        v1 = encode_v1(snapshot)
+        v2 = encode_v2_json(compact)
+        encoded = {
+            "v1": (v1, compress_variants(v1)),
+            "v2": (v2, compress_variants(v2))
+        }
+        v2_msgpack = encode_v2_msgpack(compact)
+        if v2_msgpack is not None:
+            encoded["v2-msgpack"] = (v2_msgpack, {"identity": v2_msgpack})
+        return encoded
+
+    def get_snapshot(self):
+        """현재 스냅샷 (dict) 반환"""
+        with self.lock:
+            return self.snapshot
+
+    def get_snapshot_json(self):
+        """(v1 JSON 본문, 인코딩별 압축본, 스냅샷 경과 시간(초)) 반환"""
+        return self.get_encoded("v1")
+
+    def get_encoded(self, fmt):
+        """(포맷별 본문, 인코딩별 압축본, 스냅샷 경과 시간(초)) 반환 (미지원 포맷은 None)"""
+        with self.lock:
+            if fmt not in self.encoded:
+                return None
+            body, variants = self.encoded[fmt]
+            return body, variants, time.time() - self.generated_at
+
+
+class SnapshotRoutesMixin:
+    """수집기 스냅샷을 그대로 내려주는 공용 라우트 (/api/devices, /api/v2/devices, /api/stream)
+
+    DashboardRequestHandler와 함께 상속하고 status_poller / broadcaster 클래스
+    속성에 이 서버의 수집기와 SSE 브로드캐스터를 지정합니다.
+    """
+
+    status_poller = None
+    broadcaster = None
+
+    def send_snapshot(self, encoded, content_type):
+        """미리 직렬화된 스냅샷 전송 (Age = 스냅샷 경과 시간)"""
+        body, variants, age = encoded
+        self.send_body(body, content_type, variants=variants, headers={
+            'Age': str(int(age)),
+            'X-Snapshot-Age': f"{age:.3f}"
+        })
+
+    def send_real_devices_status(self):
+        """디바이스 상태 전송 (백그라운드 수집기의 최신 스냅샷)"""
+        self.send_snapshot(self.status_poller.get_snapshot_json(), 'application/json')
+
+    def send_devices_v2(self):
+        """디바이스 상태 v2 API (숫자 필드, 압축 JSON / 선택적 MessagePack)"""
+        query = parse_qs(urlparse(self.path).query)
+        wants_msgpack = ('msgpack' in query.get('format', [''])[0]
+                         or 'application/msgpack' in self.headers.get('Accept', ''))
+        encoded = self.status_poller.get_encoded("v2-msgpack") if wants_msgpack else None
+        if encoded is not None:
+            self.send_snapshot(encoded, 'application/msgpack')
+        else:
+            self.send_snapshot(self.status_poller.get_encoded("v2"), 'application/json')
+
+    def send_event_stream(self):
+        """실시간 변경 푸시 (SSE) - 접속 시 전체 스냅샷, 이후 변경분만 전송"""
+        self.broadcaster.stream(self, [format_event("snapshot", self.status_poller.get_snapshot())])
+
+
+# 대시보드 공용 스냅샷 클라이언트 (SSE 수신 + 실패 시 폴링 대체)
+# 페이지 쪽에 createDeviceCard, deviceConfigs, updateSystemInfo, updateNasInfo, lastUpdateTime이 있어야 함
+SNAPSHOT_CLIENT_JS = """
+        function formatProbeAge(device, interval) {
+            // 마지막 실제 수집 이후 경과 시간 (하트비트 디바이스는 온라인 구간, 그 외는 수집 주기의 2배 기준)
+            if (!device.last_probed) return '';
+            const age = Math.max(0, Math.round(Date.now() / 1000 - device.last_probed));
+            const staleAfter = device.stale_after || interval * 2;
+            return age > staleAfter ? ` (⚠️ ${age}초 전 수집)` : '';
+        }
+
+        let currentDevices = [];
+
+        function renderDevices(data) {
+            snapshotInterval = data.interval || snapshotInterval;
+            const snapshotAge = data.generated_at ? Math.max(0, Math.round(Date.now() / 1000 - data.generated_at)) : 0;
+            document.getElementById('timestamp').textContent = data.timestamp + ` (스냅샷 ${snapshotAge}초 전)`;
+            lastUpdateTime = new Date();
+            currentDevices = data.devices;
+            
+            const devicesGrid = document.getElementById('devices-grid');
+            devicesGrid.innerHTML = currentDevices.map((device, index) => 
+                createDeviceCard(device, deviceConfigs[index])
+            ).join('');
+            
+            // 시스템 정보 업데이트
+            updateSystemInfo({ devices: currentDevices });
+        }
+
+        function applyDelta(delta) {
+            // 변경된 디바이스만 교체하고 나머지는 유지
+            const changed = {};
+            delta.devices.forEach(device => { changed[device.ip] = device; });
+            renderDevices({
+                timestamp: delta.timestamp,
+                generated_at: delta.generated_at,
+                devices: currentDevices.map(device => changed[device.ip] || device)
+            });
+        }
+
+        function refreshData() {
+            fetch('/api/devices')
+                .then(response => response.json())
+                .then(data => {
+                    renderDevices(data);
+                    
+                    // NAS 정보 업데이트
+                    updateNasInfo();
+                })
+                .catch(error => {
+                    console.error('데이터 로드 실패:', error);
+                    document.getElementById('timestamp').textContent = '데이터 로드 실패 - ' + new Date().toLocaleString('ko-KR');
+                });
+        }
+
+        let pollTimer = null;
+
+        function startPolling() {
+            if (!pollTimer) pollTimer = setInterval(refreshData, snapshotInterval * 1000);
+        }
+
+        function stopPolling() {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+
+        function connectStream() {
+            // 서버 푸시(SSE) 연결 - 실패하면 재연결될 때까지 폴링으로 대체
+            if (!window.EventSource) {
+                startPolling();
+                return;
+            }
+            const source = new EventSource('/api/stream');
+            source.addEventListener('snapshot', event => {
+                stopPolling();
+                renderDevices(JSON.parse(event.data));
+            });
+            source.addEventListener('delta', event => applyDelta(JSON.parse(event.data)));
+            source.addEventListener('ping', () => { lastUpdateTime = new Date(); });
+            source.onerror = () => startPolling();
+        }
+"""
+
+
+def snapshot_client_js(interval):
+    """수집 주기를 초기값으로 넣은 스냅샷 클라이언트 스크립트"""
+    return f"\n        let snapshotInterval = {interval:g};\n" + SNAPSHOT_CLIENT_JS
@@ -1,47 +1,62 @@
 #!/usr/bin/env python3
 # enhanced_realtime_server.py - 하트비트 수신 기능이 있는 실시간 모니터링 서버
 
-import http.server
-import socketserver
-import json
 import os
 import time
-import subprocess
 import threading
-import socket
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse
+from dashboard_server_core import DashboardRequestHandler, StaticAsset, run_server
+from device_expiry import DeviceExpiryTracker
+from device_probe import DEVICE_CONFIGS
+from liveness_probe import LivenessProber
+from metrics_history import HISTORY_METRICS, MetricsHistoryStore, parse_range
+from device_status_poller import DeviceStatusPoller, SnapshotRoutesMixin, snapshot_client_js
+from event_stream import EventBroadcaster
+from heartbeat_batch import UnsupportedMediaType, decode_batch, validate_sample
 
-# 연결된 디바이스 정보 저장
+# 연결된 디바이스 정보 저장 (핸들러 스레드와 만료 스레드가 공유하므로 락으로 보호)
 connected_devices = {}
 device_last_seen = {}
+device_sampled_at = {}  # ip -> 현재 뷰에 반영된 마지막 샘플 시각 (늦게 온 백필이 최신 뷰를 덮지 않도록)
+registered_devices = {}  # ip -> 등록 정보 (재시작/만료 후 비어 있으면 에이전트에 재등록 요청)
+devices_lock = threading.Lock()
 
-class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
-    def add_cors_headers(self):
-        """CORS 헤더 추가 (도메인 접속 지원)"""
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.send_header('Access-Control-Allow-Credentials', 'true')
-    
+# 마지막 하트비트 후 이 시간(초)이 지나면 오프라인 (대시보드 지연 표시 기준도 동일)
+HEARTBEAT_ONLINE_WINDOW = 30
+
+# 하트비트 메트릭 시계열 (메모리 링 버퍼 + 디스크 롤업)
+history_store = MetricsHistoryStore(data_dir="metrics_history")
+
+class EnhancedRealTimeHandler(SnapshotRoutesMixin, DashboardRequestHandler):
     def do_OPTIONS(self):
         """CORS preflight 요청 처리"""
         self.send_response(200)
         self.add_cors_headers()
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_GET(self):
+        parsed = urlparse(self.path)
         if self.path == '/':
             self.send_dashboard_html()
         elif self.path == '/api/devices':
             self.send_real_devices_status()
+        elif urlparse(self.path).path == '/api/v2/devices':
+            self.send_devices_v2()
         elif self.path == '/api/nas':
             self.send_nas_status()
+        elif self.path == '/api/stream':
+            self.send_event_stream()
+        elif parsed.path.startswith('/api/devices/') and parsed.path.endswith('/history'):
+            self.send_device_history(parsed)
         else:
             super().do_GET()
     
     def do_POST(self):
         if self.path == '/api/heartbeat':
             self.handle_heartbeat()
+        elif self.path == '/api/heartbeat/batch':
+            self.handle_heartbeat_batch()
         elif self.path == '/api/register':
             self.handle_device_registration()
         else:
@@ -50,51 +65,97 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
     def handle_heartbeat(self):
         """디바이스 하트비트 처리"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                heartbeat_data = json.loads(post_data.decode('utf-8'))
-                
-                device_name = heartbeat_data.get('device_name', 'Unknown')
-                device_ip = heartbeat_data.get('ip', 'Unknown')
+            heartbeat_data = self.read_json_body()
+            if heartbeat_data:
+                error = validate_sample(heartbeat_data)
+                if error:
+                    self.send_json({"status": "error", "error": error}, status=400, indent=None)
+                    return
+                device_ip = heartbeat_data['ip']
                 
                 # 디바이스 정보 업데이트
-                connected_devices[device_ip] = heartbeat_data
-                device_last_seen[device_ip] = time.time()
+                now = time.time()
+                unknown = ingest_heartbeats([(now, heartbeat_data)], now)
                 
-                print(f"💓 하트비트 수신: {device_name} ({device_ip}) - CPU: {heartbeat_data.get('cpu', 'N/A')}")
+                with devices_lock:
+                    view = connected_devices.get(device_ip, {})
+                    device_name = registered_devices.get(device_ip, {}).get('name', view.get('device_name', 'Unknown'))
+                print(f"💓 하트비트 수신: {device_name} ({device_ip}) - CPU: {view.get('cpu', 'N/A')}")
                 
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                response = {"status": "received", "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
-                self.wfile.write(json.dumps(response).encode())
+                response = {
+                    "status": "received",
+                    "registration_required": bool(unknown),
+                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+                }
+                self.send_json(response, indent=None)
             else:
                 self.send_error(400, "No heartbeat data")
         except Exception as e:
             print(f"❌ 하트비트 처리 오류: {e}")
             self.send_error(500, f"Heartbeat error: {str(e)}")
     
+    def handle_heartbeat_batch(self):
+        """배치 하트비트 처리 (NDJSON/MessagePack, 샘플별 ack 반환)"""
+        try:
+            samples = decode_batch(self.read_body(), self.headers.get('Content-Type'))
+        except UnsupportedMediaType as e:
+            self.send_json({"status": "error", "error": str(e)}, status=415, indent=None)
+            return
+        except ValueError as e:
+            self.send_json({"status": "error", "error": str(e)}, status=400, indent=None)
+            return
+        
+        try:
+            now = time.time()
+            accepted = []
+            acks = []
+            for index, seq, sample, error in samples:
+                if error:
+                    acks.append({"index": index, "seq": seq, "status": "rejected", "error": error})
+                    continue
+                # 에이전트 시계가 앞서도 미래 시각으로 기록되지 않도록 수신 시각으로 제한
+                sampled_at = min(sample.get('sampled_at') or now, now)
+                accepted.append((sampled_at, sample))
+                acks.append({"index": index, "seq": seq, "status": "ok"})
+            
+            unknown = ingest_heartbeats(accepted, now)
+            
+            if accepted:
+                devices = sorted({sample['ip'] for _, sample in accepted})
+                print(f"💓 배치 하트비트 수신: {len(accepted)}건 ({', '.join(devices)})")
+            
+            response = {
+                "status": "received",
+                "accepted": len(accepted),
+                "rejected": len(acks) - len(accepted),
+                "acks": acks,
+                "registration_required": bool(unknown),
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self.send_json(response, indent=None)
+        except Exception as e:
+            print(f"❌ 배치 하트비트 처리 오류: {e}")
+            self.send_error(500, f"Heartbeat batch error: {str(e)}")
+    
     def handle_device_registration(self):
         """디바이스 등록 처리"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                device_info = json.loads(post_data.decode('utf-8'))
-                
-                device_ip = device_info.get('ip', 'Unknown')
+            device_info = self.read_json_body()
+            if device_info:
+                error = validate_sample(device_info)
+                if error:
+                    self.send_json({"status": "error", "error": error}, status=400, indent=None)
+                    return
+                device_ip = device_info['ip']
                 device_name = device_info.get('name', 'Unknown')
                 
+                with devices_lock:
+                    registered_devices[device_ip] = device_info
+                
                 print(f"📱 디바이스 등록: {device_name} ({device_ip})")
                 
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
                 response = {"status": "registered", "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
-                self.wfile.write(json.dumps(response).encode())
+                self.send_json(response, indent=None)
             else:
                 self.send_error(400, "No registration data")
         except Exception as e:
@@ -103,12 +164,37 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
     
     def send_dashboard_html(self):
         """실시간 모니터링 대시보드 HTML"""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.add_cors_headers()
-        self.end_headers()
+        self.send_asset(dashboard_asset)
+    
+    def send_nas_status(self):
+        """NAS 상태 API"""
+        nas_status = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "nas_devices": [
+                {
+                    "name": "SnapCodex NAS",
+                    "ip": "192.168.219.175",
+                    "status": "정상",
+                    "hostname": os.uname().nodename
+                },
+                {
+                    "name": "Desinsight2 NAS",
+                    "ip": "desinsight2.local", 
+                    "status": "대기 중"
+                },
+                {
+                    "name": "Office NAS",
+                    "ip": "desinsight.synology.me",
+                    "status": "대기 중"
+                }
+            ]
+        }
         
-        html = '''<!DOCTYPE html>
+        self.send_json(nas_status)
+
+def build_dashboard_html():
+    """실시간 모니터링 대시보드 HTML"""
+    return '''<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
@@ -205,6 +291,18 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
             font-size: 1.2em;
             font-weight: bold;
         }
+        .ollama-info {
+            font-size: 0.85em;
+            margin-top: 10px;
+            padding: 8px;
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 8px;
+        }
+        .metric-detail {
+            font-size: 0.75em;
+            opacity: 0.7;
+            margin-top: 4px;
+        }
         .progress-bar {
             width: 100%;
             height: 6px;
@@ -396,14 +494,14 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
                     <div class="metrics">
                         <div class="metric">
                             <div class="metric-label">CPU</div>
-                            <div class="metric-value">${device.cpu}</div>
+                            <div class="metric-value">${device.cpu}</div>${formatWindowStats(device.cpu_stats)}
                             <div class="progress-bar">
                                 <div class="progress-fill ${getProgressBarClass(device.cpu)}" style="width: ${cpuValue}%"></div>
                             </div>
                         </div>
                         <div class="metric">
                             <div class="metric-label">메모리</div>
-                            <div class="metric-value">${device.memory}</div>
+                            <div class="metric-value">${device.memory}</div>${formatWindowStats(device.memory_stats)}
                             <div class="progress-bar">
                                 <div class="progress-fill ${getProgressBarClass(device.memory)}" style="width: ${memValue}%"></div>
                             </div>
@@ -420,35 +518,39 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
                             <div class="metric-value">${isOnline ? '정상' : '연결 끊김'}</div>
                         </div>
                     </div>
-                    <div class="last-update">마지막 업데이트: ${device.last_update || '알 수 없음'}</div>
+                    ${formatOllama(device.ollama)}
+                    ${formatTopProcesses(device.top_processes)}
+                    <div class="last-update">마지막 업데이트: ${device.last_update || '알 수 없음'}${formatProbeAge(device, snapshotInterval)}</div>
                 </div>
             `;
         }
 
-        function refreshData() {
-            fetch('/api/devices')
-                .then(response => response.json())
-                .then(data => {
-                    document.getElementById('timestamp').textContent = data.timestamp;
-                    lastUpdateTime = new Date();
-                    
-                    const devicesGrid = document.getElementById('devices-grid');
-                    devicesGrid.innerHTML = data.devices.map((device, index) => 
-                        createDeviceCard(device, deviceConfigs[index])
-                    ).join('');
-                    
-                    // NAS 정보 업데이트
-                    updateNasInfo();
-                    
-                    // 시스템 정보 업데이트
-                    updateSystemInfo(data);
-                })
-                .catch(error => {
-                    console.error('데이터 로드 실패:', error);
-                    document.getElementById('timestamp').textContent = '데이터 로드 실패 - ' + new Date().toLocaleString('ko-KR');
-                });
+        function formatWindowStats(stats) {
+            // 하트비트 구간 동안의 분포 (짧은 스파이크 확인용)
+            if (!stats) return '';
+            return `<div class="metric-detail">p95 ${Math.round(stats.p95)}% · 최대 ${Math.round(stats.max)}%</div>`;
         }
 
+        function formatOllama(ollama) {
+            // 로드된 모델/메모리/연결 수/최근 생성 속도 - 어느 노드에 추론 여유가 있는지 확인
+            if (!ollama) return '';
+            if (!ollama.running) return '<div class="ollama-info">🦙 Ollama 중지됨</div>';
+            const models = ollama.models.length
+                ? ollama.models.map(model => model.name).join(', ')
+                : '로드된 모델 없음';
+            const rate = ollama.generation ? ` · ${ollama.generation.tokens_per_s} tok/s` : '';
+            return `<div class="ollama-info">🦙 ${models} · ${(ollama.rss_mb / 1024).toFixed(1)}GB · 연결 ${ollama.active_connections}${rate}</div>`;
+        }
+
+        function formatTopProcesses(top) {
+            // CPU 상위 3개 프로세스 (어떤 작업이 부하를 만드는지 확인)
+            if (!top || !top.cpu.length) return '';
+            const items = top.cpu.slice(0, 3).map(proc => `${proc.name} ${Math.round(proc.cpu)}%`);
+            return `<div class="metric-detail">🔝 ${items.join(' · ')}</div>`;
+        }
+
+''' + snapshot_client_js(status_poller.interval) + '''
+
         function updateNasInfo() {
             fetch('/api/nas')
                 .then(response => response.json())
@@ -491,11 +593,12 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
             `;
         }
 
-        // 초기 로드
+        // 초기 로드 후 실시간 스트림 연결
         refreshData();
+        connectStream();
         
-        // 5초마다 자동 새로고침 (더 빠른 업데이트)
-        setInterval(refreshData, 5000);
+        // NAS 정보는 30초마다 갱신
+        setInterval(updateNasInfo, 30000);
         
         // 연결 상태 체크
         setInterval(() => {
@@ -507,151 +610,161 @@ class EnhancedRealTimeHandler(http.server.SimpleHTTPRequestHandler):
     </script>
 </body>
 </html>'''
-        
-        self.wfile.write(html.encode())
+
+
+def ingest_heartbeats(samples, received_at):
+    """[(샘플 시각, 하트비트)]를 시간순으로 반영 - 델타를 누적해 디바이스별 전체 뷰를 재구성
+
+    에이전트는 바뀐 필드만 보내고 주기적으로 전체 상태(full=True)를 보냅니다.
+    미등록 디바이스나 기준 뷰 없이 델타가 온 디바이스의 IP 집합을 반환하며,
+    에이전트는 이를 보고 재등록 후 전체 상태를 다시 보냅니다.
+    """
+    samples = sorted(samples, key=lambda item: item[0])
+    if not samples:
+        return set()
     
-    def send_real_devices_status(self):
-        """실제 디바이스 상태 수집 및 전송 (하트비트 데이터 포함)"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        devices_status = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "devices": []
-        }
-        
-        # 각 디바이스 상태 확인
-        device_configs = [
-            {"name": "HOME iMac i7 64GB", "ip": "192.168.219.100"},
-            {"name": "Mac Mini M2 Pro 32GB", "ip": "192.168.219.101"},
-            {"name": "Office iMac i7 40GB", "ip": "192.168.219.102"},
-            {"name": "Mac Studio M4 Pro 64GB", "ip": "192.168.219.103"},
-            {"name": "Mobile Ecosystem", "ip": "mobile"}
-        ]
-        
-        current_time = time.time()
-        
-        for device_config in device_configs:
-            device_ip = device_config["ip"]
-            device_name = device_config["name"]
-            
-            # 하트비트 데이터가 있는지 확인
-            if device_ip in connected_devices and device_ip in device_last_seen:
-                last_seen = device_last_seen[device_ip]
-                
-                # 30초 이내에 하트비트가 있었다면 온라인
-                if current_time - last_seen < 30:
-                    heartbeat_data = connected_devices[device_ip]
-                    device_status = {
-                        "name": device_name,
-                        "ip": device_ip,
-                        "status": "online",
-                        "cpu": heartbeat_data.get('cpu', '0%'),
-                        "memory": heartbeat_data.get('memory', '0%'),
-                        "disk": heartbeat_data.get('disk', '0%'),
-                        "last_update": heartbeat_data.get('timestamp', time.strftime("%H:%M:%S"))
-                    }
-                else:
-                    # 하트비트가 오래됨
-                    device_status = {
-                        "name": device_name,
-                        "ip": device_ip,
-                        "status": "offline",
-                        "cpu": "0%",
-                        "memory": "0%",
-                        "disk": "0%",
-                        "last_update": "연결 끊김"
-                    }
+    views = []
+    unknown = set()
+    with devices_lock:
+        for sampled_at, heartbeat_data in samples:
+            device_ip = heartbeat_data.get('ip', 'Unknown')
+            base = connected_devices.get(device_ip)
+            device_last_seen[device_ip] = received_at
+            if base is not None and sampled_at < device_sampled_at.get(device_ip, 0):
+                # 이전 배치보다 오래된 샘플(재전송 백필)은 이력에만 기록
+                view = dict(heartbeat_data)
+                view.pop('full', None)
+                views.append((device_ip, view, sampled_at))
+                continue
+            if heartbeat_data.get('full') or base is None:
+                if base is None and not heartbeat_data.get('full'):
+                    unknown.add(device_ip)  # 기준 뷰 없는 델타 - 전체 상태 재전송 필요
+                view = dict(heartbeat_data)
             else:
-                # 하트비트 데이터가 없음 - ping 테스트로 대체
-                if device_ip == "mobile":
-                    device_status = {
-                        "name": device_name,
-                        "ip": device_ip,
-                        "status": "partial",
-                        "cpu": "N/A",
-                        "memory": "N/A",
-                        "disk": "N/A",
-                        "last_update": time.strftime("%H:%M:%S")
-                    }
-                else:
-                    is_online = self.ping_device(device_ip)
-                    device_status = {
-                        "name": device_name,
-                        "ip": device_ip,
-                        "status": "online" if is_online else "offline",
-                        "cpu": f"{__import__('random').randint(10, 50)}%" if is_online else "0%",
-                        "memory": f"{__import__('random').randint(20, 60)}%" if is_online else "0%",
-                        "disk": f"{__import__('random').randint(15, 40)}%" if is_online else "0%",
-                        "last_update": time.strftime("%H:%M:%S") if is_online else "연결 끊김"
-                    }
-            
-            devices_status["devices"].append(device_status)
-        
-        self.wfile.write(json.dumps(devices_status, indent=2).encode())
+                view = dict(base)
+                view.update(heartbeat_data)
+            view.pop('full', None)
+            connected_devices[device_ip] = view
+            device_sampled_at[device_ip] = sampled_at
+            views.append((device_ip, view, sampled_at))
+        device_ips = {device_ip for device_ip, _, _ in views}
+        unknown.update(device_ip for device_ip in device_ips if device_ip not in registered_devices)
     
-    def ping_device(self, ip):
-        """디바이스 ping 테스트"""
-        try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '1000', ip], 
-                capture_output=True, 
-                text=True, 
-                timeout=2
-            )
-            return result.returncode == 0
-        except:
-            return False
+    for device_ip in device_ips:
+        expiry_tracker.touch(device_ip, received_at)
+    history_store.record_batch(views)
+    status_poller.trigger()
+    return unknown
+
+def collect_device_statuses():
+    """하트비트 데이터와 생존 확인 결과로 전체 디바이스 상태 구성"""
+    current_time = time.time()
+    devices = []
     
-    def send_nas_status(self):
-        """NAS 상태 API"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
+    with devices_lock:
+        heartbeats = dict(connected_devices)
+        last_seen_times = dict(device_last_seen)
+    
+    # 하트비트가 없는 디바이스만 한 번에 동시 생존 확인
+    unseen_hosts = [c["ip"] for c in DEVICE_CONFIGS
+                    if c["ip"] != "mobile" and c["ip"] not in last_seen_times]
+    rtts = liveness_prober.probe_many(unseen_hosts)
+    
+    for device_config in DEVICE_CONFIGS:
+        device_ip = device_config["ip"]
+        device_name = device_config["name"]
         
-        nas_status = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "nas_devices": [
-                {
-                    "name": "SnapCodex NAS",
-                    "ip": "192.168.219.175",
-                    "status": "정상",
-                    "hostname": os.uname().nodename
-                },
-                {
-                    "name": "Desinsight2 NAS",
-                    "ip": "desinsight2.local", 
-                    "status": "대기 중"
-                },
-                {
-                    "name": "Office NAS",
-                    "ip": "desinsight.synology.me",
-                    "status": "대기 중"
+        # 하트비트 데이터가 있는지 확인
+        if device_ip in heartbeats and device_ip in last_seen_times:
+            last_seen = last_seen_times[device_ip]
+            
+            # 온라인 구간 이내에 하트비트가 있었다면 온라인
+            if current_time - last_seen < HEARTBEAT_ONLINE_WINDOW:
+                heartbeat_data = heartbeats[device_ip]
+                device_status = {
+                    "name": device_name,
+                    "ip": device_ip,
+                    "status": "online",
+                    "cpu": heartbeat_data.get('cpu', '0%'),
+                    "memory": heartbeat_data.get('memory', '0%'),
+                    "disk": heartbeat_data.get('disk', '0%'),
+                    "last_update": heartbeat_data.get('timestamp', time.strftime("%H:%M:%S"))
+                }
+                # 에이전트 고속 샘플링 구간 요약 (min/mean/p95/max), Ollama 추론 상태, 상위 프로세스
+                for detail_key in ('cpu_stats', 'memory_stats', 'ollama', 'top_processes'):
+                    if detail_key in heartbeat_data:
+                        device_status[detail_key] = heartbeat_data[detail_key]
+            else:
+                # 하트비트가 오래됨
+                device_status = {
+                    "name": device_name,
+                    "ip": device_ip,
+                    "status": "offline",
+                    "cpu": "0%",
+                    "memory": "0%",
+                    "disk": "0%",
+                    "last_update": "연결 끊김"
+                }
+            # 스냅샷 시각이 아니라 마지막 하트비트 수신 시각 (대시보드 지연 표시 기준)
+            device_status["last_probed"] = last_seen
+            device_status["stale_after"] = HEARTBEAT_ONLINE_WINDOW
+        else:
+            # 하트비트 데이터가 없음 - 생존 확인으로 대체
+            if device_ip == "mobile":
+                device_status = {
+                    "name": device_name,
+                    "ip": device_ip,
+                    "status": "partial",
+                    "cpu": "N/A",
+                    "memory": "N/A",
+                    "disk": "N/A",
+                    "last_update": time.strftime("%H:%M:%S")
+                }
+            else:
+                is_online = rtts.get(device_ip) is not None
+                device_status = {
+                    "name": device_name,
+                    "ip": device_ip,
+                    "status": "online" if is_online else "offline",
+                    "cpu": f"{__import__('random').randint(10, 50)}%" if is_online else "0%",
+                    "memory": f"{__import__('random').randint(20, 60)}%" if is_online else "0%",
+                    "disk": f"{__import__('random').randint(15, 40)}%" if is_online else "0%",
+                    "last_update": time.strftime("%H:%M:%S") if is_online else "연결 끊김"
                 }
-            ]
-        }
         
-        self.wfile.write(json.dumps(nas_status, indent=2).encode())
-
-def cleanup_old_devices():
-    """오래된 디바이스 정보 정리"""
-    current_time = time.time()
-    timeout = 60  # 60초 타임아웃
+        devices.append(device_status)
     
-    devices_to_remove = []
-    for device_ip, last_seen in device_last_seen.items():
-        if current_time - last_seen > timeout:
-            devices_to_remove.append(device_ip)
-    
-    for device_ip in devices_to_remove:
-        if device_ip in connected_devices:
-            del connected_devices[device_ip]
-        if device_ip in device_last_seen:
-            del device_last_seen[device_ip]
-        print(f"🗑️  타임아웃된 디바이스 제거: {device_ip}")
+    return devices
+
+# 하트비트가 없는 디바이스용 생존 확인 (SSH 포트 TCP connect)
+liveness_prober = LivenessProber(port=22, timeout=1.0)
+
+# 백그라운드 수집기 - 5초마다(또는 하트비트 수신 즉시) 스냅샷 갱신
+status_poller = DeviceStatusPoller(collect_device_statuses, interval=5.0)
+
+broadcaster = EventBroadcaster(max_clients=16)
+status_poller.add_listener(broadcaster.publish_device_changes)
+EnhancedRealTimeHandler.status_poller = status_poller
+EnhancedRealTimeHandler.broadcaster = broadcaster
+
+dashboard_asset = StaticAsset.from_text(build_dashboard_html())
+
+def handle_device_expired(device_ip, last_seen):
+    """하트비트 만료 이벤트 - 디바이스 정보 제거 후 스냅샷 즉시 갱신"""
+    with devices_lock:
+        # 만료 판정과 이 락 사이에 새 하트비트가 들어왔으면 제거하지 않음
+        if device_last_seen.get(device_ip, 0) > last_seen or expiry_tracker.get_last_seen(device_ip) is not None:
+            return
+        connected_devices.pop(device_ip, None)
+        device_last_seen.pop(device_ip, None)
+        device_sampled_at.pop(device_ip, None)
+        registered_devices.pop(device_ip, None)
+    print(f"🗑️  타임아웃된 디바이스 제거: {device_ip} (마지막 수신 {time.strftime('%H:%M:%S', time.localtime(last_seen))})")
+    status_poller.trigger()
+
+# 하트비트 만료 엔진 (60초 동안 하트비트가 없으면 제거)
+expiry_tracker = DeviceExpiryTracker(timeout=60)
+expiry_tracker.add_listener(handle_device_expired)
 
 if __name__ == "__main__":
     PORT = 5004
@@ -663,13 +776,20 @@ if __name__ == "__main__":
     print(f"💓 하트비트 수신 기능 활성화")
     print(f"🔄 5초마다 자동 새로고침")
     
-    # 정리 스레드 시작
-    import threading
-    cleanup_thread = threading.Thread(target=lambda: [cleanup_old_devices(), time.sleep(30)] and None, daemon=True)
-    cleanup_thread.start()
+    # 하트비트 만료 스레드 시작
+    expiry_tracker.start()
+    
+    # 백그라운드 상태 수집 시작
+    status_poller.start()
+    
+    # 메트릭 히스토리 복원 및 1분마다 디스크 저장
+    history_store.load()
+    history_store.start_autosave(interval=60)
     
     try:
-        with socketserver.TCPServer(("", PORT), EnhancedRealTimeHandler) as httpd:
-            httpd.serve_forever()
+        run_server(EnhancedRealTimeHandler, PORT)
     except Exception as e:
-        print(f"❌ 서버 오류: {e}") 
\ No newline at end of file
+        print(f"❌ 서버 오류: {e}")
+    finally:
+        # 마지막 autosave 이후 기록된 히스토리까지 저장
+        history_store.save()
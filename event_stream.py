@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# event_stream.py - Server-Sent Events 팬아웃 브로드캐스터 (대시보드 실시간 푸시)
+
+import json
+import queue
+import threading
+
+# 변경 여부 비교에서 제외할 필드 (매 수집마다 바뀌는 시각 정보)
+VOLATILE_FIELDS = ("last_update", "last_probed")
+
+
+def format_event(event, data):
+    """SSE 프레임 직렬화 (event/data 한 건)"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def diff_devices(previous, current):
+    """이전 스냅샷 대비 상태/메트릭이 바뀐 디바이스만 반환"""
+    before = {device["ip"]: device for device in previous}
+    changed = []
+    for device in current:
+        old = before.get(device["ip"])
+        if old is None or any(old.get(k) != v for k, v in device.items() if k not in VOLATILE_FIELDS):
+            changed.append(device)
+    return changed
+
+
+class EventBroadcaster:
+    """모든 SSE 클라이언트가 공유하는 단일 팬아웃 브로드캐스터
+
+    이벤트는 한 번만 직렬화되어 구독자별 제한 큐로 전달됩니다. 큐가 가득 찬
+    느린 클라이언트는 끊어서 다른 클라이언트와 발행자를 지연시키지 않습니다.
+    """
+
+    def __init__(self, max_clients=16, queue_size=64):
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        """구독 큐 생성 (최대 클라이언트 수 초과 시 None)"""
+        with self.lock:
+            if len(self.subscribers) >= self.max_clients:
+                return None
+            subscriber = queue.Queue(maxsize=self.queue_size)
+            self.subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        """모든 구독자에게 이벤트 전달"""
+        frame = format_event(event, data)
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(frame)
+            except queue.Full:
+                # 따라오지 못하는 클라이언트는 연결 종료 신호 후 제거
+                self.unsubscribe(subscriber)
+                try:
+                    subscriber.get_nowait()
+                    subscriber.put_nowait(None)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def publish_device_changes(self, previous, current):
+        """스냅샷 변경분만 'delta' 이벤트로 발행"""
+        changed = diff_devices(previous["devices"], current["devices"])
+        if changed:
+            self.publish("delta", {
+                "timestamp": current["timestamp"],
+                "generated_at": current["generated_at"],
+                "devices": changed
+            })
+
+    def stream(self, handler, initial_frames=(), keepalive=15):
+        """SSE 응답 전송 루프 (핸들러 스레드에서 클라이언트 연결 종료까지 실행)"""
+        subscriber = self.subscribe()
+        if subscriber is None:
+            handler.send_error(503, "Too many stream clients")
+            return
+
+        try:
+            # 스트림은 연결 전용 스레드에서 돌고, 요청 처리 슬롯은 max_clients와 별도로 유지
+            release_slot = getattr(handler, 'release_request_slot', None)
+            if release_slot is not None:
+                release_slot()
+
+            handler.send_response(200)
+            handler.send_header('Content-Type', 'text/event-stream')
+            handler.send_header('Cache-Control', 'no-cache')
+            handler.send_header('Connection', 'close')
+            handler.send_header('Access-Control-Allow-Origin', '*')
+            handler.end_headers()
+            handler.close_connection = True
+
+            for frame in initial_frames:
+                handler.wfile.write(frame)
+            handler.wfile.flush()
+
+            while not getattr(handler.server, 'closed', False):
+                try:
+                    frame = subscriber.get(timeout=keepalive)
+                except queue.Empty:
+                    # 변경이 없어도 클라이언트가 연결 상태를 알 수 있도록 ping 전송
+                    frame = format_event("ping", {})
+                if frame is None:
+                    break
+                handler.wfile.write(frame)
+                handler.wfile.flush()
+        except OSError:
+            pass  # 클라이언트 연결 끊김/타임아웃
+        finally:
+            self.unsubscribe(subscriber)
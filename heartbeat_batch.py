@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# heartbeat_batch.py - 배치 하트비트 디코딩/검증 (NDJSON 또는 MessagePack 배열)
+
+import ipaddress
+import json
+
+try:
+    import msgpack  # 선택 의존성 - 없으면 NDJSON만 수신
+except ImportError:
+    msgpack = None
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json")
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+MAX_BATCH_SAMPLES = 5000
+
+
+class UnsupportedMediaType(ValueError):
+    """이 서버에서 디코딩할 수 없는 Content-Type (HTTP 415)"""
+
+
+def decode_batch(body, content_type):
+    """본문 → [(순번, seq, 샘플 dict 또는 None, 오류 메시지)] (줄/항목 단위로 개별 실패 처리)"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in MSGPACK_TYPES:
+        if msgpack is None:
+            raise UnsupportedMediaType("msgpack not supported on this server")
+        items = msgpack.unpackb(body, raw=False)
+        if not isinstance(items, list):
+            raise ValueError("msgpack body must be an array of samples")
+        decoded = [(item, None) for item in items]
+    elif media_type in NDJSON_TYPES or not media_type:
+        decoded = []
+        for line in body.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                decoded.append((json.loads(line), None))
+            except ValueError as e:
+                decoded.append((None, f"invalid json: {e}"))
+    else:
+        raise UnsupportedMediaType(f"unsupported content type: {media_type}")
+
+    if len(decoded) > MAX_BATCH_SAMPLES:
+        raise ValueError(f"too many samples (max {MAX_BATCH_SAMPLES})")
+
+    samples = []
+    for index, (sample, error) in enumerate(decoded):
+        seq = sample.get("seq") if isinstance(sample, dict) else None
+        if error is None:
+            error = validate_sample(sample)
+        samples.append((index, seq, sample if error is None else None, error))
+    return samples
+
+
+def validate_sample(sample):
+    """샘플 필수 필드 검사 (정상이면 None, 아니면 오류 메시지)"""
+    if not isinstance(sample, dict):
+        return "sample must be an object"
+    if not sample.get("ip"):
+        return "missing ip"
+    try:
+        # ip는 히스토리 파일명/시계열 키로 쓰이므로 실제 IP 주소만 허용
+        ipaddress.ip_address(str(sample["ip"]))
+    except ValueError:
+        return "ip must be an IP address"
+    sampled_at = sample.get("sampled_at")
+    if sampled_at is not None and not isinstance(sampled_at, (int, float)):
+        return "sampled_at must be epoch seconds"
+    return None
@@ -1,16 +1,14 @@
 #!/usr/bin/env python3
 # integrated_dashboard_server.py - 5대 디바이스 통합 모니터링 대시보드
 
-import http.server
-import socketserver
-import json
 import os
 import time
 import subprocess
 import threading
 from urllib.parse import urlparse, parse_qs
+from dashboard_server_core import DashboardRequestHandler, StaticAsset, run_server
 
-class IntegratedDashboardHandler(http.server.SimpleHTTPRequestHandler):
+class IntegratedDashboardHandler(DashboardRequestHandler):
     def do_GET(self):
         if self.path == '/':
             self.send_dashboard_html()
@@ -23,11 +21,87 @@ class IntegratedDashboardHandler(http.server.SimpleHTTPRequestHandler):
     
     def send_dashboard_html(self):
         """통합 대시보드 HTML 전송"""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
+        self.send_asset(dashboard_asset)
+    
+    def send_devices_status(self):
+        """디바이스 상태 API"""
+        devices_status = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "devices": [
+                {
+                    "name": "HOME iMac i7 64GB",
+                    "ip": "192.168.219.100",
+                    "status": "online",
+                    "cpu": "45%",
+                    "memory": "62%",
+                    "disk": "35%"
+                },
+                {
+                    "name": "Mac Mini M2 Pro 32GB",
+                    "ip": "192.168.219.101", 
+                    "status": "online",
+                    "cpu": "32%",
+                    "memory": "48%",
+                    "disk": "28%"
+                },
+                {
+                    "name": "Office iMac i7 40GB",
+                    "ip": "192.168.219.102",
+                    "status": "offline",
+                    "cpu": "0%",
+                    "memory": "0%", 
+                    "disk": "0%"
+                },
+                {
+                    "name": "Mac Studio M4 Pro 64GB",
+                    "ip": "192.168.219.103",
+                    "status": "online",
+                    "cpu": "28%",
+                    "memory": "41%",
+                    "disk": "22%"
+                },
+                {
+                    "name": "Mobile Ecosystem",
+                    "ip": "mobile",
+                    "status": "partial",
+                    "cpu": "N/A",
+                    "memory": "N/A",
+                    "disk": "N/A"
+                }
+            ]
+        }
+        
+        self.send_json(devices_status)
+    
+    def send_nas_status(self):
+        """NAS 상태 API"""
+        nas_status = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "nas_devices": [
+                {
+                    "name": "SnapCodex NAS",
+                    "ip": "192.168.219.175",
+                    "status": "online",
+                    "hostname": os.uname().nodename
+                },
+                {
+                    "name": "Desinsight2 NAS",
+                    "ip": "desinsight2.local", 
+                    "status": "standby"
+                },
+                {
+                    "name": "Office NAS",
+                    "ip": "desinsight.synology.me",
+                    "status": "standby"
+                }
+            ]
+        }
         
-        html = f'''<!DOCTYPE html>
+        self.send_json(nas_status)
+
+def build_dashboard_html():
+    """통합 대시보드 HTML"""
+    return f'''<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
@@ -360,94 +434,8 @@ class IntegratedDashboardHandler(http.server.SimpleHTTPRequestHandler):
     </script>
 </body>
 </html>'''
-        
-        self.wfile.write(html.encode())
-    
-    def send_devices_status(self):
-        """디바이스 상태 API"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        devices_status = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "devices": [
-                {
-                    "name": "HOME iMac i7 64GB",
-                    "ip": "192.168.219.100",
-                    "status": "online",
-                    "cpu": "45%",
-                    "memory": "62%",
-                    "disk": "35%"
-                },
-                {
-                    "name": "Mac Mini M2 Pro 32GB",
-                    "ip": "192.168.219.101", 
-                    "status": "online",
-                    "cpu": "32%",
-                    "memory": "48%",
-                    "disk": "28%"
-                },
-                {
-                    "name": "Office iMac i7 40GB",
-                    "ip": "192.168.219.102",
-                    "status": "offline",
-                    "cpu": "0%",
-                    "memory": "0%", 
-                    "disk": "0%"
-                },
-                {
-                    "name": "Mac Studio M4 Pro 64GB",
-                    "ip": "192.168.219.103",
-                    "status": "online",
-                    "cpu": "28%",
-                    "memory": "41%",
-                    "disk": "22%"
-                },
-                {
-                    "name": "Mobile Ecosystem",
-                    "ip": "mobile",
-                    "status": "partial",
-                    "cpu": "N/A",
-                    "memory": "N/A",
-                    "disk": "N/A"
-                }
-            ]
-        }
-        
-        self.wfile.write(json.dumps(devices_status, indent=2).encode())
-    
-    def send_nas_status(self):
-        """NAS 상태 API"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        nas_status = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "nas_devices": [
-                {
-                    "name": "SnapCodex NAS",
-                    "ip": "192.168.219.175",
-                    "status": "online",
-                    "hostname": os.uname().nodename
-                },
-                {
-                    "name": "Desinsight2 NAS",
-                    "ip": "desinsight2.local", 
-                    "status": "standby"
-                },
-                {
-                    "name": "Office NAS",
-                    "ip": "desinsight.synology.me",
-                    "status": "standby"
-                }
-            ]
-        }
-        
-        self.wfile.write(json.dumps(nas_status, indent=2).encode())
+
+dashboard_asset = StaticAsset.from_text(build_dashboard_html())
 
 if __name__ == "__main__":
     PORT = 5002
@@ -459,7 +447,6 @@ if __name__ == "__main__":
     print(f"🔄 30초마다 자동 새로고침")
     
     try:
-        with socketserver.TCPServer(("", PORT), IntegratedDashboardHandler) as httpd:
-            httpd.serve_forever()
+        run_server(IntegratedDashboardHandler, PORT)
     except Exception as e:
         print(f"❌ 서버 오류: {e}") 
\ No newline at end of file
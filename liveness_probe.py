@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# liveness_probe.py - 프로세스 내 디바이스 생존 확인 (TCP connect / ICMP, ping 프로세스 미사용)
+
+import errno
+import os
+import selectors
+import socket
+import struct
+import threading
+import time
+
+# 연결 거부(RST)도 호스트가 살아 있다는 응답으로 간주
+ALIVE_ERRNOS = {0, errno.ECONNREFUSED}
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+
+def icmp_checksum(data):
+    """ICMP 헤더 체크섬 (RFC 1071)"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def resolve(host):
+    """호스트명을 IPv4 주소로 변환 (실패 시 None)"""
+    try:
+        return socket.gethostbyname(host)
+    except OSError:
+        return None
+
+
+class LivenessProber:
+    """여러 호스트를 하나의 셀렉터(또는 하나의 raw 소켓)로 동시에 확인
+
+    기본은 지정 포트(기본 22, SSH)로의 TCP connect 검사이며, use_icmp=True이고
+    raw 소켓 권한이 있으면 ICMP echo를 사용합니다. 권한이 없으면 TCP로 대체합니다.
+    결과는 {호스트: 왕복 시간(ms) 또는 None} 형태입니다.
+    """
+
+    def __init__(self, port=22, timeout=1.0, use_icmp=False):
+        self.port = port
+        self.timeout = timeout
+        self.use_icmp = use_icmp
+        self.icmp_socket = None
+        self.icmp_id = os.getpid() & 0xFFFF
+        self.sequence = 0
+        self.icmp_lock = threading.Lock()  # 공유 raw 소켓의 응답이 섞이지 않도록 직렬화
+
+    def probe(self, host):
+        """단일 호스트 확인 (왕복 시간 ms 또는 None)"""
+        return self.probe_many([host])[host]
+
+    def probe_many(self, hosts):
+        """여러 호스트를 동시에 확인"""
+        hosts = list(dict.fromkeys(hosts))
+        if not hosts:
+            return {}
+        if self.use_icmp and self.open_icmp_socket():
+            with self.icmp_lock:
+                return self.probe_icmp(hosts)
+        return self.probe_tcp(hosts)
+
+    def probe_tcp(self, hosts):
+        """비차단 TCP connect를 한 셀렉터에 모아 대기"""
+        results = {host: None for host in hosts}
+        selector = selectors.DefaultSelector()
+        started = {}
+
+        try:
+            for host in hosts:
+                address = resolve(host)
+                if address is None:
+                    continue
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                started[host] = time.perf_counter()
+                code = sock.connect_ex((address, self.port))
+                if code in ALIVE_ERRNOS:
+                    results[host] = (time.perf_counter() - started[host]) * 1000
+                    sock.close()
+                elif code in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+                    selector.register(sock, selectors.EVENT_WRITE, host)
+                else:
+                    sock.close()
+
+            deadline = time.perf_counter() + self.timeout
+            while selector.get_map():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                for key, _ in selector.select(remaining):
+                    host = key.data
+                    sock = key.fileobj
+                    code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if code in ALIVE_ERRNOS:
+                        results[host] = (time.perf_counter() - started[host]) * 1000
+                    selector.unregister(sock)
+                    sock.close()
+        finally:
+            for key in list(selector.get_map().values()):
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+            selector.close()
+
+        return results
+
+    def open_icmp_socket(self):
+        """raw ICMP 소켓 준비 (권한 없으면 False)"""
+        if self.icmp_socket is None:
+            try:
+                self.icmp_socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+                self.icmp_socket.setblocking(False)
+            except PermissionError:
+                print("⚠️  raw ICMP 권한 없음 - TCP connect 검사로 대체")
+                self.use_icmp = False
+                return False
+        return True
+
+    def probe_icmp(self, hosts):
+        """하나의 raw 소켓으로 모든 호스트에 echo 요청 후 응답 수집"""
+        results = {host: None for host in hosts}
+        pending = {}  # (주소, 시퀀스) -> (호스트, 전송 시각)
+        sock = self.icmp_socket
+
+        for host in hosts:
+            address = resolve(host)
+            if address is None:
+                continue
+            self.sequence = (self.sequence + 1) & 0xFFFF
+            header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, self.icmp_id, self.sequence)
+            payload = b'desinsight-liveness'
+            checksum = icmp_checksum(header + payload)
+            packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, self.icmp_id, self.sequence) + payload
+            try:
+                sock.sendto(packet, (address, 0))
+                pending[(address, self.sequence)] = (host, time.perf_counter())
+            except OSError:
+                continue
+
+        selector = selectors.DefaultSelector()
+        selector.register(sock, selectors.EVENT_READ)
+        try:
+            deadline = time.perf_counter() + self.timeout
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0 or not selector.select(remaining):
+                    break
+                while True:
+                    try:
+                        data, (address, _) = sock.recvfrom(1024)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    # raw 소켓 수신 데이터에는 IP 헤더가 포함됨
+                    offset = (data[0] & 0x0F) * 4
+                    if len(data) < offset + 8:
+                        continue
+                    icmp_type, _, _, packet_id, sequence = struct.unpack('!BBHHH', data[offset:offset + 8])
+                    if icmp_type != ICMP_ECHO_REPLY or packet_id != self.icmp_id:
+                        continue
+                    entry = pending.pop((address, sequence), None)
+                    if entry:
+                        host, sent_at = entry
+                        results[host] = (time.perf_counter() - sent_at) * 1000
+        finally:
+            selector.unregister(sock)
+            selector.close()
+
+        return results
+
+    def close(self):
+        """ICMP 소켓 정리"""
+        if self.icmp_socket is not None:
+            self.icmp_socket.close()
+            self.icmp_socket = None
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# metrics_history.py - 하트비트 메트릭 시계열 저장소 (고정 크기 링 버퍼 + 1분/1시간 롤업)
+
+import json
+import os
+import re
+import threading
+import time
+from array import array
+
+RAW_CAPACITY = 8640       # 원본 샘플 (10초 간격 기준 24시간)
+MINUTE_CAPACITY = 1440    # 1분 롤업 24시간
+HOUR_CAPACITY = 720       # 1시간 롤업 30일
+
+HISTORY_METRICS = ("cpu", "memory", "disk")
+
+RANGE_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_metric_value(value):
+    """'45%' / 45 / '45.2' → 45.0 (해석 불가 시 None)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_range(text, default=86400):
+    """'24h', '30m', '7d' → 초 단위 구간"""
+    match = re.fullmatch(r'(\d+)([smhd])', (text or '').strip())
+    if not match:
+        return default
+    return int(match.group(1)) * RANGE_UNITS[match.group(2)]
+
+
+class RingBuffer:
+    """필드별 array('d')로 구성된 고정 크기 링 버퍼 (가동 시간과 무관하게 메모리 일정)"""
+
+    def __init__(self, capacity, fields):
+        self.capacity = capacity
+        self.fields = fields
+        self.columns = {field: array('d', bytes(8 * capacity)) for field in fields}
+        self.head = 0   # 다음에 쓸 위치
+        self.size = 0
+
+    def append(self, *values):
+        """한 행 추가 (가득 차면 가장 오래된 행을 덮어씀)"""
+        for field, value in zip(self.fields, values):
+            self.columns[field][self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def rows(self, since=None):
+        """시간순 행 목록 (첫 필드가 타임스탬프, since 이후만)"""
+        start = (self.head - self.size) % self.capacity
+        result = []
+        for i in range(self.size):
+            index = (start + i) % self.capacity
+            row = tuple(self.columns[field][index] for field in self.fields)
+            if since is None or row[0] >= since:
+                result.append(row)
+        return result
+
+    def to_dict(self):
+        """디스크 저장용 직렬화 (시간순)"""
+        return {"capacity": self.capacity, "rows": self.rows()}
+
+    def load_rows(self, rows):
+        """저장된 행 복원"""
+        for row in rows[-self.capacity:]:
+            self.append(*row)
+
+
+class RollupSeries:
+    """고정 폭 버킷(min/max/sum/count)으로 다운샘플링한 시계열"""
+
+    FIELDS = ("ts", "min", "max", "sum", "count")
+
+    def __init__(self, width, capacity):
+        self.width = width
+        self.buffer = RingBuffer(capacity, self.FIELDS)
+        self.bucket = None  # 현재 집계 중인 버킷 [시작, min, max, sum, count]
+
+    def add(self, timestamp, value):
+        """샘플을 현재 버킷에 누적 (버킷이 바뀌면 이전 버킷을 확정)"""
+        start = timestamp - timestamp % self.width
+        if self.bucket and start < self.bucket[0]:
+            return  # 이미 확정된 구간의 늦은 샘플은 롤업에서 제외
+        if self.bucket and self.bucket[0] != start:
+            self.buffer.append(*self.bucket)
+            self.bucket = None
+        if self.bucket is None:
+            self.bucket = [start, value, value, 0.0, 0]
+        self.bucket[1] = min(self.bucket[1], value)
+        self.bucket[2] = max(self.bucket[2], value)
+        self.bucket[3] += value
+        self.bucket[4] += 1
+
+    def points(self, since):
+        """[ts, 평균, 최소, 최대] 목록 (집계 중인 버킷 포함)"""
+        rows = self.buffer.rows(since)
+        if self.bucket and self.bucket[0] >= since:
+            rows.append(tuple(self.bucket))
+        return [[ts, total / count, low, high] for ts, low, high, total, count in rows if count]
+
+    def to_dict(self):
+        return {"rows": self.buffer.rows(), "bucket": self.bucket}
+
+    def load(self, data):
+        self.buffer.load_rows(data.get("rows", []))
+        self.bucket = data.get("bucket")
+
+
+class MetricSeries:
+    """메트릭 하나의 원본 + 1분 + 1시간 시계열"""
+
+    def __init__(self):
+        self.raw = RingBuffer(RAW_CAPACITY, ("ts", "value"))
+        self.minute = RollupSeries(60, MINUTE_CAPACITY)
+        self.hour = RollupSeries(3600, HOUR_CAPACITY)
+
+    def add(self, timestamp, value):
+        self.raw.append(timestamp, value)
+        self.minute.add(timestamp, value)
+        self.hour.add(timestamp, value)
+
+    def query(self, range_seconds, now=None):
+        """구간 길이에 맞는 해상도 선택 (1시간 이하 원본, 24시간 이하 1분, 그 이상 1시간)"""
+        since = (now or time.time()) - range_seconds
+        if range_seconds <= 3600:
+            # 백필(늦게 도착한) 샘플은 삽입 순서와 시간 순서가 다를 수 있어 정렬
+            return "raw", [[ts, value, value, value] for ts, value in sorted(self.raw.rows(since))]
+        if range_seconds <= 86400:
+            return "1m", self.minute.points(since)
+        return "1h", self.hour.points(since)
+
+
+class MetricsHistoryStore:
+    """디바이스/메트릭별 시계열 보관소
+
+    원본 샘플은 메모리 링 버퍼에만, 1분/1시간 롤업은 주기적으로 디스크에
+    저장해 재시작 후에도 추세를 이어서 볼 수 있습니다.
+    """
+
+    def __init__(self, data_dir="metrics_history"):
+        self.data_dir = data_dir
+        self.series = {}  # (ip, 메트릭) -> MetricSeries
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def record(self, device_ip, heartbeat_data, timestamp=None):
+        """하트비트의 cpu/memory/disk 값을 기록"""
+        timestamp = timestamp or time.time()
+        with self.lock:
+            self.add_sample(device_ip, heartbeat_data, timestamp)
+
+    def record_batch(self, samples):
+        """[(ip, 하트비트, 타임스탬프)]를 락 한 번으로 기록 (백필 샘플은 시간순으로 전달)"""
+        with self.lock:
+            for device_ip, heartbeat_data, timestamp in samples:
+                self.add_sample(device_ip, heartbeat_data, timestamp)
+
+    def add_sample(self, device_ip, heartbeat_data, timestamp):
+        """샘플 한 건 반영 (호출자가 락 보유)"""
+        for metric in HISTORY_METRICS:
+            value = parse_metric_value(heartbeat_data.get(metric))
+            if value is None:
+                continue
+            key = (device_ip, metric)
+            if key not in self.series:
+                self.series[key] = MetricSeries()
+            self.series[key].add(timestamp, value)
+
+    def query(self, device_ip, metric, range_seconds):
+        """{'resolution': ..., 'points': [[ts, 평균, 최소, 최대], ...]} (기록 없으면 None)"""
+        with self.lock:
+            series = self.series.get((device_ip, metric))
+            if series is None:
+                return None
+            resolution, points = series.query(range_seconds)
+        return {"resolution": resolution, "points": points}
+
+    def save(self):
+        """롤업을 디바이스별 JSON 파일로 원자적 저장"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        with self.lock:
+            per_device = {}
+            for (device_ip, metric), series in self.series.items():
+                per_device.setdefault(device_ip, {})[metric] = {
+                    "1m": series.minute.to_dict(),
+                    "1h": series.hour.to_dict()
+                }
+        for device_ip, metrics in per_device.items():
+            # 한 디바이스 저장이 실패해도 나머지 디바이스는 저장
+            try:
+                path = os.path.join(self.data_dir, f"history_{device_ip}.json")
+                with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                    json.dump({"ip": device_ip, "metrics": metrics}, f)
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                print(f"❌ 히스토리 저장 실패: {device_ip} ({e})")
+
+    def load(self):
+        """저장된 롤업 복원"""
+        if not os.path.isdir(self.data_dir):
+            return
+        for filename in os.listdir(self.data_dir):
+            if not (filename.startswith("history_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(self.data_dir, filename), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  히스토리 파일 로드 실패: {filename} ({e})")
+                continue
+            with self.lock:
+                for metric, rollups in data.get("metrics", {}).items():
+                    series = self.series.setdefault((data["ip"], metric), MetricSeries())
+                    series.minute.load(rollups.get("1m", {}))
+                    series.hour.load(rollups.get("1h", {}))
+
+    def start_autosave(self, interval=60):
+        """주기적 디스크 저장 스레드 시작"""
+        def autosave():
+            while not self.stopped.wait(interval):
+                try:
+                    self.save()
+                except Exception as e:
+                    print(f"❌ 히스토리 저장 실패: {e}")
+
+        threading.Thread(target=autosave, name="metrics-history-autosave", daemon=True).start()
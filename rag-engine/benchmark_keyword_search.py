@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Desinsight 분산형 RAG 시스템 - 키워드 검색 벤치마크 (토큰화 방식별 재현율/지연시간)
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from keyword_index import TOKENIZERS, KeywordIndex, tokenize
+
+# 합성 건설 코퍼스 재료
+NOUNS = [
+    '공사비', '철근', '콘크리트', '거푸집', '단열재', '방수층', '안전난간', '추락방지망',
+    '기초', '골조', '마감재', '타일', '창호', '배관', '전기설비', '환기설비', '외벽', '지붕',
+    '슬래브', '기둥', '보강', '양생', '시공사', '감리', '설계도면', '평면도', '입면도', '축척',
+    '압축강도', '내구성', '공정표', '자재비', '인건비', '현장소장', '품질검사', '하자보수',
+]
+PARTICLES = ['', '는', '은', '를', '을', '가', '이', '의', '에', '에서', '로', '으로', '와', '과', '도', '만']
+VERBS = ['확인합니다', '검토했다', '증가했다', '감소했다', '시공한다', '점검합니다', '교체했다', '설치한다']
+LATIN = ['RC', 'MPa', 'PHC', 'BIM', 'mm', 'ALC', 'KS']
+
+
+def make_corpus(size: int, seed: int = 0) -> List[str]:
+    """명사+조사 어절, 동사, 영문 약어를 섞은 합성 문서"""
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(8, 20)):
+            roll = rng.random()
+            if roll < 0.7:
+                words.append(rng.choice(NOUNS) + rng.choice(PARTICLES))
+            elif roll < 0.9:
+                words.append(rng.choice(VERBS))
+            else:
+                words.append(f"{rng.randint(1, 300)}{rng.choice(LATIN)}" if rng.random() < 0.5 else rng.choice(LATIN))
+        docs.append(' '.join(words) + '.')
+    return docs
+
+
+def substring_scan(docs: List[str], query: str) -> List[int]:
+    """기존 폴백 - 쿼리 키워드가 본문에 부분 문자열로 포함된 문서 전체 스캔"""
+    keywords = set(tokenize(query))
+    return [i for i, doc in enumerate(docs) if any(word in doc.lower() for word in keywords)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키워드 검색 벤치마크")
+    parser.add_argument("--docs", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    docs = make_corpus(args.docs)
+    queries = random.Random(1).choices(NOUNS, k=args.queries)
+    lowered = [doc.lower() for doc in docs]
+
+    # 정답: 명사(어간)가 부분 문자열로 들어 있는 문서
+    relevant = {noun: {i for i, doc in enumerate(lowered) if noun in doc} for noun in set(queries)}
+
+    print(f"📊 문서 {args.docs}개, 쿼리 {args.queries}개 (조사가 붙은 명사를 단독 명사로 검색), k={args.k}")
+    print(f"{'방식':>12} {'색인 s':>8} {'용어 수':>9} {'재현율':>8} {'P@k':>7} {'ms/쿼리':>9}")
+
+    start = time.perf_counter()
+    for query in queries:
+        substring_scan(docs, query)
+    scan_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"{'substring':>12} {'-':>8} {'-':>9} {1.0:>8.3f} {'-':>7} {scan_ms:>9.2f}")
+
+    for name in TOKENIZERS:
+        start = time.perf_counter()
+        index = KeywordIndex(name)
+        for doc in docs:
+            index.add(doc)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, k=args.k)
+        query_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        # 재현율은 매칭된 문서 전체 기준
+        recall_sum = precision_sum = 0.0
+        hits = [index.search(query, k=len(docs)) for query in queries]
+        for query, result in zip(queries, hits):
+            matched = {doc_id for _, doc_id in result}
+            recall_sum += len(matched & relevant[query]) / max(1, len(relevant[query]))
+            top = [doc_id for _, doc_id in result[:args.k]]
+            precision_sum += sum(1 for doc_id in top if doc_id in relevant[query]) / args.k
+
+        print(f"{name:>12} {build_s:>8.2f} {len(index.postings):>9} "
+              f"{recall_sum / len(queries):>8.3f} {precision_sum / len(queries):>7.3f} {query_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
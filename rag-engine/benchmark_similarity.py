@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Desinsight 분산형 RAG 시스템 - 유사도 검색 벤치마크 (파이썬 루프 vs 벡터화 top-k)
+"""
+
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from vector_index import VectorIndex
+
+
+def loop_search(vector_store: List[np.ndarray], query: np.ndarray, k: int) -> List:
+    """기존 방식 - 문서마다 두 벡터의 노름을 다시 계산하고 전체 정렬"""
+    similarities = []
+    for i, doc_embedding in enumerate(vector_store):
+        similarity = np.dot(query, doc_embedding) / (
+            np.linalg.norm(query) * np.linalg.norm(doc_embedding)
+        )
+        similarities.append((similarity, i))
+    similarities.sort(reverse=True)
+    return similarities[:k]
+
+
+def timed(func, repeat: int) -> float:
+    """1회 평균 소요 시간 (ms)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사도 검색 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384, help="임베딩 차원 (all-MiniLM-L6-v2 = 384)")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=32, help="배치 검색 쿼리 수")
+    parser.add_argument("--loop-max", type=int, default=100_000, help="파이썬 루프를 측정할 최대 문서 수")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.batch, args.dim), dtype=np.float32)
+
+    print(f"📊 dim={args.dim}, k={args.k}, batch={args.batch}")
+    print(f"{'vectors':>10} {'loop ms':>10} {'single ms':>10} {'batch ms/q':>11} {'speedup':>9}")
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, args.dim), dtype=np.float32)
+        index = VectorIndex(dim=args.dim, capacity=size)
+        index.add(vectors)
+
+        # 결과 일치 확인 (상위 k개 행 번호)
+        if size <= args.loop_max:
+            store = list(vectors)
+            expected = [i for _, i in loop_search(store, queries[0], args.k)]
+            _, indices = index.search(queries[0], k=args.k)
+            assert list(indices[0]) == expected, "벡터화 결과가 루프 결과와 다릅니다"
+            loop_ms = timed(lambda: loop_search(store, queries[0], args.k), 1)
+            del store
+        else:
+            loop_ms = None
+
+        single_ms = timed(lambda: index.search(queries[0], k=args.k), 5)
+        batch_ms = timed(lambda: index.search(queries, k=args.k), 3) / args.batch
+
+        loop_text = f"{loop_ms:>10.1f}" if loop_ms is not None else f"{'-':>10}"
+        speedup = f"{loop_ms / single_ms:>8.0f}x" if loop_ms is not None else f"{'-':>9}"
+        print(f"{size:>10} {loop_text} {single_ms:>10.2f} {batch_ms:>11.3f} {speedup}")
+        del index, vectors
+
+
+if __name__ == "__main__":
+    main()
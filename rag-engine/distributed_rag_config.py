@@ -11,6 +11,9 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional
 import json
 
+# 임베딩 서버 기본 배치 크기 (rag_config.json의 rag.embedding_batch_size)
+DEFAULT_EMBEDDING_BATCH_SIZE = 32
+
 @dataclass
 class SystemSpec:
     """시스템 사양"""
@@ -135,7 +138,7 @@ class DistributedRAGConfig:
                     'context_length': 4096
                 },
                 'rag': {
-                    'embedding_batch_size': 32,
+                    'embedding_batch_size': DEFAULT_EMBEDDING_BATCH_SIZE,
                     'vector_dimensions': 384,
                     'similarity_threshold': 0.7,
                     'enable_preprocessing': True
@@ -210,6 +213,17 @@ class DistributedRAGConfig:
         print(f"   • 메모리 사용량: {psutil.virtual_memory().percent}%")
         print(f"   • 디스크 여유 공간: {psutil.disk_usage('/').free / (1024**3):.1f}GB")
 
+def load_embedding_batch_size(filename: str = "rag_config.json") -> int:
+    """저장된 설정의 embedding_batch_size (없으면 기본값)"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            batch_size = json.load(f).get('rag', {}).get('embedding_batch_size')
+    except (OSError, ValueError, AttributeError):
+        batch_size = None
+    if isinstance(batch_size, int) and batch_size > 0:
+        return batch_size
+    return DEFAULT_EMBEDDING_BATCH_SIZE
+
 def main():
     """설정 관리자 실행"""
     print("🎯 Desinsight 분산형 RAG 시스템 설정 관리자\n")
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Desinsight 분산형 RAG 시스템 - 임베딩 캐시 (모델 + 정규화 텍스트 sha256 → float32 벡터, SQLite)
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+import unicodedata
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# rag_config.json의 storage.vector_db_path 기본값과 같은 위치
+EMBEDDING_CACHE_PATH = "./vector_store/embedding_cache.db"
+# 384차원 float32 기준 약 150MB
+MAX_CACHE_ENTRIES = 100_000
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화 - NFC, 앞뒤 공백 제거, 연속 공백 하나로"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """(모델, 텍스트 해시) → 임베딩 영구 캐시
+
+    벡터는 float32 blob으로 저장하고, last_used 기준으로 오래된 항목부터
+    지워 max_entries를 넘지 않게 유지합니다 (LRU).
+    """
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH, max_entries: int = MAX_CACHE_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, key)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """텍스트별 캐시된 벡터 (없으면 None), 조회된 항목은 last_used 갱신"""
+        keys = [text_key(text) for text in texts]
+        found = self.lookup(model, keys)
+        return [found.get(key) for key in keys]
+
+    def lookup(self, model: str, keys: List[str]) -> Dict[str, np.ndarray]:
+        """키 → 캐시된 벡터 (적중/미스는 고유 키 기준으로 집계)"""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        # SQLite 변수 개수 제한 안에서 나눠 조회
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(chunk))})",
+                [model] + chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+
+        if found:
+            now = time.time()
+            self.conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND key = ?",
+                [(now, model, key) for key in found]
+            )
+            self.conn.commit()
+
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        return found
+
+    def put_many(self, model: str, texts: List[str], vectors: np.ndarray):
+        """벡터 저장 후 용량 초과분을 LRU로 제거"""
+        self.store(model, [text_key(text) for text in texts], vectors)
+
+    def store(self, model: str, keys: List[str], vectors: np.ndarray):
+        """키별 벡터 저장 후 용량 초과분을 LRU로 제거"""
+        now = time.time()
+        rows = []
+        for key, vector in zip(keys, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((model, key, vector.shape[0], vector.tobytes(), now))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, key, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN "
+                "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            self.evicted += overflow
+        self.conn.commit()
+
+    def encode(self, model: str, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """캐시에 없는 텍스트만 encode_fn으로 한 번에 임베딩 → [len(texts), dim] float32
+
+        정규화 후 같은 텍스트는 키 하나로 묶어 한 번만 임베딩합니다.
+        """
+        keys = [text_key(text) for text in texts]
+        found = self.lookup(model, keys)
+        representative = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                representative.setdefault(key, text)
+        if representative:
+            missing = list(representative)
+            encoded = np.asarray(encode_fn([representative[key] for key in missing]), dtype=np.float32)
+            self.store(model, missing, encoded)
+            found.update(zip(missing, encoded))
+        return np.vstack([found[key] for key in keys]) if keys else np.empty((0, 0), dtype=np.float32)
+
+    def stats(self) -> Dict:
+        """적중/미스 통계"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evicted': self.evicted
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Ollama 생성 통계 기록 - 모니터링 에이전트가 tokens/s를 계산하는 로컬 로그
+"""
+
+import json
+import os
+import time
+
+# 모니터링 에이전트(device_monitoring_agent.py)가 읽는 위치와 동일해야 함
+GENERATION_LOG = os.path.expanduser("~/.device_monitoring_agent/ollama_generations.jsonl")
+MAX_LOG_BYTES = 1 << 20  # 넘으면 최근 절반만 남김
+
+
+def response_field(response, key):
+    """dict 응답과 ollama 클라이언트 응답 객체 모두에서 필드 조회"""
+    if isinstance(response, dict):
+        return response.get(key)
+    return getattr(response, key, None)
+
+
+def record_generation(model: str, response, path: str = GENERATION_LOG) -> None:
+    """chat/generate 응답의 eval_count/eval_duration을 한 줄로 기록 (실패해도 무시)"""
+    eval_count = response_field(response, 'eval_count')
+    eval_duration = response_field(response, 'eval_duration')
+    if not eval_count or not eval_duration:
+        return
+
+    entry = {
+        "ts": time.time(),
+        "model": model,
+        "eval_count": eval_count,
+        "eval_duration": eval_duration  # 나노초
+    }
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        if os.path.getsize(path) > MAX_LOG_BYTES:
+            with open(path, encoding="utf-8") as f:
+                lines = f.readlines()
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines[len(lines) // 2:])
+            os.replace(tmp_path, path)
+    except OSError:
+        pass
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Desinsight 분산형 RAG 시스템 - 키워드 역색인 (BM25 + 힙 top-k)
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+# BM25 파라미터 (일반적인 기본값)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# 한글 음절 n-gram 크기 (조사가 붙은 어절도 어간의 n-gram을 공유)
+HANGUL_NGRAM_SIZES = (2, 3)
+HANGUL_OR_WORD = re.compile(r'[가-힣]+|[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """간단한 토큰화 - 공백/구두점 분리, 2글자 이상, 소문자 (중복 유지)"""
+    words = text.replace(',', ' ').replace('.', ' ').split()
+    tokens = []
+    for word in words:
+        word = word.strip('()[]{}:;,.')
+        if len(word) > 1:  # 2글자 이상만
+            tokens.append(word.lower())
+    return tokens
+
+
+def korean_tokenize(text: str) -> List[str]:
+    """한글 음절 2/3-gram + 영문·숫자 소문자 단어 (중복 유지)
+
+    "공사비는", "공사비를" 모두 "공사비"의 n-gram을 포함하므로
+    부분 문자열 검사 없이도 조사가 붙은 어절이 매칭됩니다.
+    """
+    tokens = []
+    for run in HANGUL_OR_WORD.findall(text.lower()):
+        if run[0] < '가':  # 영문/숫자 단어
+            if len(run) > 1:
+                tokens.append(run)
+            continue
+        if len(run) <= HANGUL_NGRAM_SIZES[0]:
+            tokens.append(run)
+            continue
+        for n in HANGUL_NGRAM_SIZES:
+            tokens.extend(run[i:i + n] for i in range(len(run) - n + 1))
+    return tokens
+
+
+# 이름으로 선택 가능한 토큰화 단계
+TOKENIZERS: Dict[str, Callable[[str], List[str]]] = {
+    'whitespace': tokenize,
+    'korean': korean_tokenize,
+}
+
+
+class KeywordIndex:
+    """용어 → 포스팅 리스트 역색인
+
+    문서 추가 시 용어별 (문서 번호, 빈도)를 포스팅에 붙여 두므로,
+    검색은 쿼리 용어의 포스팅만 훑고 전체 코퍼스 크기와 무관합니다.
+    """
+
+    def __init__(self, tokenizer: str = 'korean', k1: float = BM25_K1, b: float = BM25_B):
+        if tokenizer not in TOKENIZERS:
+            raise ValueError(f"알 수 없는 토큰화 방식: {tokenizer} ({', '.join(TOKENIZERS)})")
+        self.tokenizer = tokenizer
+        self.tokenize = TOKENIZERS[tokenizer]
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.doc_lengths: List[int] = []
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, text: str) -> int:
+        """문서 색인 → 부여된 문서 번호"""
+        doc_id = len(self.doc_lengths)
+        tokens = self.tokenize(text)
+        for term, freq in Counter(tokens).items():
+            self.postings.setdefault(term, []).append((doc_id, freq))
+        self.doc_lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        return doc_id
+
+    def idf(self, term: str) -> float:
+        """BM25 역문서빈도 (항상 양수인 변형)"""
+        df = len(self.postings.get(term, ()))
+        n = len(self.doc_lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, int]]:
+        """BM25 상위 k개 → [(점수, 문서 번호)] 점수 내림차순"""
+        if not self.doc_lengths:
+            return []
+
+        avg_length = self.total_length / len(self.doc_lengths) or 1.0
+        k1, b = self.k1, self.b
+        scores: Dict[int, float] = {}
+        for term in set(self.tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, freq in postings:
+                norm = k1 * (1 - b + b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (k1 + 1) / (freq + norm)
+
+        # 매칭 문서 중 상위 k개만 힙으로 선택 (전체 정렬 없음)
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, doc_id) for doc_id, score in top]
@@ -9,16 +9,19 @@ import json
 from datetime import datetime
 from typing import List, Dict
 import hashlib
+from generation_stats import record_generation
+from keyword_index import KeywordIndex, tokenize
 
 class SimpleRAGSystem:
-    def __init__(self):
+    def __init__(self, tokenizer: str = 'korean'):
         print("🎯 Desinsight RAG 시스템 초기화...")
         
         # Ollama 연결
         self.ollama_client = ollama.Client()
         
-        # 문서 저장소 (간단한 텍스트 매칭 사용)
+        # 문서 저장소 + 키워드 역색인 (문서 번호 = documents 인덱스)
         self.documents = []
+        self.keyword_index = KeywordIndex(tokenizer)
         
         print("✅ RAG 시스템 초기화 완료!")
     
@@ -40,55 +43,32 @@ class SimpleRAGSystem:
         }
         
         self.documents.append(doc_entry)
+        self.keyword_index.add(text)
         print(f"✅ 문서 추가 완료 (총 {len(self.documents)}개)")
     
     def _extract_keywords(self, text: str) -> List[str]:
         """간단한 키워드 추출"""
-        # 한글과 영문 키워드 추출
-        words = text.replace(',', ' ').replace('.', ' ').split()
-        keywords = []
-        
-        for word in words:
-            word = word.strip('()[]{}:;,.')
-            if len(word) > 1:  # 2글자 이상만
-                keywords.append(word.lower())
-        
-        return list(set(keywords))  # 중복 제거
+        # 한글과 영문 키워드 추출 (역색인과 같은 토큰화)
+        return list(set(tokenize(text)))  # 중복 제거
     
     def search_documents(self, query: str, k: int = 3) -> List[Dict]:
-        """키워드 기반 문서 검색"""
+        """키워드 기반 문서 검색 (역색인 + BM25)"""
         if not self.documents:
             return []
         
         print(f"🔍 검색 쿼리: {query}")
         
-        query_keywords = self._extract_keywords(query)
-        scores = []
-        
-        for i, doc in enumerate(self.documents):
-            # 키워드 매칭 점수 계산
-            doc_keywords = doc['keywords']
-            common_keywords = set(query_keywords) & set(doc_keywords)
-            
-            # 텍스트 직접 포함 확인
-            text_matches = sum(1 for keyword in query_keywords if keyword in doc['text'].lower())
-            
-            score = len(common_keywords) * 2 + text_matches
-            if score > 0:
-                scores.append((score, i))
-        
-        # 점수순 정렬
-        scores.sort(reverse=True)
+        # 쿼리 용어의 포스팅만 훑어 BM25 점수 계산, 힙으로 상위 k개 선택
         results = []
         
-        for score, doc_idx in scores[:k]:
+        for score, doc_idx in self.keyword_index.search(query, k=k):
             doc = self.documents[doc_idx]
             results.append({
                 'text': doc['text'],
-                'score': score,
+                'score': round(score, 3),
                 'metadata': doc['metadata']
             })
-            print(f"  📌 점수 {score}: {doc['text'][:50]}...")
+            print(f"  📌 점수 {score:.3f}: {doc['text'][:50]}...")
         
         return results
     
@@ -134,6 +114,7 @@ class SimpleRAGSystem:
                 ]
             )
             
+            record_generation('llama3.2:3b', response)
             answer = response['message']['content']
             print(f"💡 답변: {answer}")
             return answer
@@ -153,6 +134,10 @@ class SimpleRAGSystem:
         if os.path.exists(filename):
             with open(filename, 'r', encoding='utf-8') as f:
                 self.documents = json.load(f)
+            # 역색인은 저장하지 않고 로드 시 다시 구성
+            self.keyword_index = KeywordIndex(self.keyword_index.tokenizer)
+            for doc in self.documents:
+                self.keyword_index.add(doc['text'])
             print(f"📂 지식베이스 로드됨: {filename} ({len(self.documents)}개 문서)")
         else:
             print(f"⚠️ 지식베이스 파일이 없습니다: {filename}")
@@ -219,7 +204,7 @@ def main():
     print("\n🎯 RAG 시스템 테스트 완료!")
     print("\n📊 결과 요약:")
     print(f"  • 문서 수: {len(rag.documents)}개")
-    print(f"  • 검색 방식: 키워드 기반 매칭")
+    print(f"  • 검색 방식: 키워드 역색인 (BM25, {rag.keyword_index.tokenizer} 토큰화)")
     print(f"  • LLM 모델: llama3.2:3b")
     print("  • 지식베이스: knowledge_base.json 저장됨")
 
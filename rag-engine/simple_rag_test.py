@@ -4,15 +4,24 @@ Desinsight 분산형 RAG 시스템 - 기본 테스트
 """
 
 import os
+import time
+from itertools import islice
 import ollama
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Iterable
 import json
 from datetime import datetime
+from generation_stats import record_generation
+from vector_store import DiskVectorStore, VECTOR_STORE_PATH
+from distributed_rag_config import load_embedding_batch_size
+from embedding_cache import EmbeddingCache, EMBEDDING_CACHE_PATH
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
 
 class SimpleRAGSystem:
-    def __init__(self):
+    def __init__(self, config_path: str = "rag_config.json", cache_path: str = EMBEDDING_CACHE_PATH,
+                 store_path: str = VECTOR_STORE_PATH):
         print("🎯 Desinsight RAG 시스템 초기화...")
         
         # Ollama 연결
@@ -20,11 +29,15 @@ class SimpleRAGSystem:
         
         # 임베딩 모델 로드 (가벼운 버전)
         print("📦 임베딩 모델 로드 중...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        self.embedding_batch_size = load_embedding_batch_size(config_path)
+        
+        # 같은 텍스트는 다시 임베딩하지 않음 (모델 + 텍스트 해시 기준)
+        self.embedding_cache = EmbeddingCache(cache_path)
         
-        # 메모리 벡터 저장소 (임시)
-        self.vector_store = []
-        self.documents = []
+        # 디스크 벡터 저장소 (memmap float32 행렬 + 문서 메타데이터, 재시작 시 그대로 매핑)
+        self.vector_store = DiskVectorStore(store_path)
+        print(f"📂 벡터 저장소 로드: {store_path} ({len(self.vector_store)}개 문서)")
         
         print("✅ RAG 시스템 초기화 완료!")
     
@@ -33,57 +46,93 @@ class SimpleRAGSystem:
         print(f"📄 문서 추가: {text[:50]}...")
         
         # 텍스트 임베딩 생성
-        embedding = self.embedding_model.encode(text)
-        
-        # 메타데이터 설정
-        if metadata is None:
-            metadata = {}
-        metadata['added_at'] = datetime.now().isoformat()
-        
-        # 저장
-        doc_entry = {
-            'text': text,
-            'embedding': embedding,
-            'metadata': metadata
-        }
+        embeddings = self.encode([text])
+        self._store_documents([text], embeddings, [metadata])
         
-        self.documents.append(doc_entry)
-        self.vector_store.append(embedding)
-        
-        print(f"✅ 문서 추가 완료 (총 {len(self.documents)}개)")
+        print(f"✅ 문서 추가 완료 (총 {len(self.vector_store)}개)")
+    
+    def add_documents(self, texts: Iterable[str], metadatas: Iterable[Dict] = None,
+                      batch_size: int = None) -> int:
+        """문서 일괄 추가 - 이터레이터에서 batch_size개씩 읽어 한 번에 임베딩"""
+        batch_size = batch_size or self.embedding_batch_size
+        texts = iter(texts)
+        metadatas = iter(metadatas) if metadatas is not None else None
+        
+        print(f"📚 문서 일괄 추가 (배치 {batch_size})...")
+        start = time.perf_counter()
+        added = 0
+        
+        while True:
+            batch = list(islice(texts, batch_size))
+            if not batch:
+                break
+            batch_metadata = list(islice(metadatas, len(batch))) if metadatas is not None else []
+            batch_metadata += [None] * (len(batch) - len(batch_metadata))
+            
+            embeddings = self.encode(batch, batch_size=batch_size)
+            self._store_documents(batch, embeddings, batch_metadata)
+            added += len(batch)
+        
+        elapsed = time.perf_counter() - start
+        rate = added / elapsed if elapsed > 0 else 0.0
+        print(f"✅ {added}개 문서 추가 완료 ({rate:.1f} docs/s, 총 {len(self.vector_store)}개)")
+        print(f"🗃️ 임베딩 캐시: {self.embedding_cache.stats()}")
+        return added
+    
+    def encode(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        """캐시를 거친 임베딩 - 캐시에 없는 텍스트만 모델로 계산"""
+        batch_size = batch_size or self.embedding_batch_size
+        return self.embedding_cache.encode(
+            EMBEDDING_MODEL, texts,
+            lambda missing: self.embedding_model.encode(missing, batch_size=batch_size)
+        )
+    
+    def _store_documents(self, texts: List[str], embeddings, metadatas: List[Dict]):
+        """문서와 임베딩을 하나의 세그먼트로 커밋 (행 번호 = 문서 번호)"""
+        added_at = datetime.now().isoformat()
+        stored_metadatas = []
+        for metadata in metadatas:
+            # 메타데이터 설정
+            if metadata is None:
+                metadata = {}
+            metadata['added_at'] = added_at
+            stored_metadatas.append(metadata)
+        
+        self.vector_store.add(embeddings, texts, stored_metadatas)
     
     def similarity_search(self, query: str, k: int = 3) -> List[Dict]:
         """유사도 검색"""
-        if not self.documents:
+        if not len(self.vector_store):
             return []
         
         print(f"🔍 검색 쿼리: {query}")
+        return self.similarity_search_batch([query], k=k)[0]
+    
+    def similarity_search_batch(self, queries: List[str], k: int = 3) -> List[List[Dict]]:
+        """여러 쿼리를 한 번에 검색 (임베딩 일괄 생성 + 행렬-행렬 곱)"""
+        if not len(self.vector_store):
+            return [[] for _ in queries]
         
         # 쿼리 임베딩
-        query_embedding = self.embedding_model.encode(query)
-        
-        # 코사인 유사도 계산
-        similarities = []
-        for i, doc_embedding in enumerate(self.vector_store):
-            similarity = np.dot(query_embedding, doc_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding)
-            )
-            similarities.append((similarity, i))
-        
-        # 상위 k개 문서 반환
-        similarities.sort(reverse=True)
-        results = []
-        
-        for sim_score, doc_idx in similarities[:k]:
-            doc = self.documents[doc_idx]
-            results.append({
-                'text': doc['text'],
-                'similarity': float(sim_score),
-                'metadata': doc['metadata']
-            })
-            print(f"  📌 유사도 {sim_score:.3f}: {doc['text'][:50]}...")
-        
-        return results
+        query_embeddings = self.encode(queries)
+        
+        # 코사인 유사도 상위 k개 (저장 벡터는 이미 정규화되어 있음)
+        scores, indices = self.vector_store.search(query_embeddings, k=k)
+        
+        all_results = []
+        for row_scores, row_indices in zip(scores, indices):
+            results = []
+            docs = self.vector_store.get_documents(row_indices)
+            for sim_score, doc in zip(row_scores, docs):
+                results.append({
+                    'text': doc['text'],
+                    'similarity': float(sim_score),
+                    'metadata': doc['metadata']
+                })
+                print(f"  📌 유사도 {sim_score:.3f}: {doc['text'][:50]}...")
+            all_results.append(results)
+        
+        return all_results
     
     def ask_question(self, question: str) -> str:
         """RAG 기반 질의응답"""
@@ -127,6 +176,7 @@ class SimpleRAGSystem:
                 ]
             )
             
+            record_generation('llama3.2:3b', response)
             answer = response['message']['content']
             print(f"💡 답변: {answer}")
             return answer
@@ -164,8 +214,12 @@ def main():
         }
     ]
     
-    for doc in documents:
-        rag.add_document(doc['text'], doc['metadata'])
+    # 저장소에 이미 있으면 다시 임베딩하지 않고 매핑된 벡터를 그대로 사용
+    if len(rag.vector_store) == 0:
+        rag.add_documents((doc['text'] for doc in documents),
+                          (doc['metadata'] for doc in documents))
+    else:
+        print(f"📂 저장된 문서 {len(rag.vector_store)}개 사용")
     
     # 테스트 질문들
     print("\n🧪 RAG 시스템 테스트 질문들:")
@@ -185,10 +239,11 @@ def main():
     
     print("\n🎯 RAG 시스템 테스트 완료!")
     print("\n📊 결과 요약:")
-    print(f"  • 문서 수: {len(rag.documents)}개")
-    print(f"  • 임베딩 모델: {rag.embedding_model.model_name}")
+    print(f"  • 문서 수: {len(rag.vector_store)}개")
+    print(f"  • 임베딩 모델: {EMBEDDING_MODEL}")
+    print(f"  • 임베딩 캐시: {rag.embedding_cache.stats()}")
     print(f"  • LLM 모델: llama3.2:3b")
-    print(f"  • 벡터 차원: {len(rag.vector_store[0]) if rag.vector_store else 0}")
+    print(f"  • 벡터 차원: {rag.vector_store.dim or 0}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Desinsight 분산형 RAG 시스템 - 벡터 인덱스 (정규화된 float32 행렬 + top-k 검색)
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# 한 번에 계산할 유사도 행렬 최대 원소 수 (쿼리 배치 × 문서 수, 약 128MB)
+MAX_SCORE_ELEMENTS = 32 * 1024 * 1024
+# 한 번에 점수를 계산할 저장 벡터 행 수 (memmap이면 이 단위로만 페이지를 읽음)
+ROW_BLOCK = 65536
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화 (float32, 0 벡터는 그대로)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """행별 상위 k개 (점수 내림차순) - 전체 정렬 대신 argpartition"""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.float32), empty.astype(np.int64)
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return (np.take_along_axis(candidate_scores, order, axis=1),
+            np.take_along_axis(candidates, order, axis=1))
+
+
+class VectorIndex:
+    """코사인 유사도 검색용 인덱스
+
+    벡터는 추가 시점에 한 번만 정규화해 연속된 float32 행렬에 저장하므로,
+    검색은 행렬 곱 한 번(쿼리 여러 개면 행렬-행렬 곱)과 argpartition으로 끝납니다.
+    """
+
+    def __init__(self, dim: int = None, capacity: int = 1024):
+        self.dim = dim
+        self.size = 0
+        self.matrix = None if dim is None else np.empty((capacity, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """저장된 정규화 벡터 (복사 없는 뷰)"""
+        if self.matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self.matrix[:self.size]
+
+    def add(self, vectors: np.ndarray) -> range:
+        """벡터(1개 또는 행렬) 추가 → 부여된 행 번호 범위"""
+        vectors = normalize_rows(vectors)
+        if self.matrix is None:
+            self.dim = vectors.shape[1]
+            self.matrix = np.empty((max(1024, len(vectors)), self.dim), dtype=np.float32)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"벡터 차원 불일치: {vectors.shape[1]} != {self.dim}")
+
+        needed = self.size + len(vectors)
+        if needed > len(self.matrix):
+            # 용량을 두 배씩 늘려 추가 비용을 상수 시간으로 분할 상환
+            grown = np.empty((max(needed, 2 * len(self.matrix)), self.dim), dtype=np.float32)
+            grown[:self.size] = self.matrix[:self.size]
+            self.matrix = grown
+
+        start = self.size
+        self.matrix[start:needed] = vectors
+        self.size = needed
+        return range(start, needed)
+
+    def search(self, queries: np.ndarray, k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """쿼리(1개 또는 행렬)별 상위 k개 → (유사도 [q, k], 행 번호 [q, k])"""
+        queries = normalize_rows(queries)
+        if self.size == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.int64)
+
+        vectors = self.vectors
+        # 유사도 행렬이 너무 커지지 않도록 쿼리와 저장 벡터를 모두 나눠 계산
+        batch = max(1, MAX_SCORE_ELEMENTS // min(self.size, ROW_BLOCK))
+        all_scores, all_indices = [], []
+        for start in range(0, len(queries), batch):
+            block_queries = queries[start:start + batch]
+            best_scores = best_indices = None
+            for row in range(0, self.size, ROW_BLOCK):
+                block = np.asarray(vectors[row:row + ROW_BLOCK])
+                block_scores, block_indices = top_k(block_queries @ block.T, k)
+                block_indices += row
+                if best_scores is not None:
+                    # 이전 블록까지의 상위 k개와 합쳐 다시 상위 k개
+                    block_scores = np.hstack([best_scores, block_scores])
+                    block_indices = np.hstack([best_indices, block_indices])
+                    block_scores, order = top_k(block_scores, k)
+                    block_indices = np.take_along_axis(block_indices, order, axis=1)
+                best_scores, best_indices = block_scores, block_indices
+            all_scores.append(best_scores)
+            all_indices.append(best_indices)
+        return np.vstack(all_scores), np.vstack(all_indices)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Desinsight 분산형 RAG 시스템 - 디스크 벡터 저장소 (append-only float32 파일 + memmap + SQLite 메타데이터)
+"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, List
+
+import numpy as np
+
+from vector_index import VectorIndex, normalize_rows
+
+# rag_config.json의 storage.vector_db_path 기본값
+VECTOR_STORE_PATH = "./vector_store"
+
+
+class DiskVectorStore(VectorIndex):
+    """재시작해도 유지되는 벡터 저장소
+
+    정규화 벡터는 vectors.f32 끝에 이어 붙이고, 문서 텍스트/메타데이터와
+    커밋된 행 수는 documents.db에 둡니다. 세그먼트(add 1회)는 벡터 fsync 후
+    SQLite 트랜잭션이 커밋돼야 보이므로, 중간에 죽어도 커밋되지 않은 꼬리는
+    다음 시작 시 잘려 나갑니다. 시작할 때는 파일을 memmap으로 열기만 하므로
+    재임베딩이 없고, RAM보다 큰 코퍼스도 블록 단위로 검색됩니다.
+    """
+
+    def __init__(self, path: str = VECTOR_STORE_PATH):
+        super().__init__()
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.vector_path = os.path.join(path, "vectors.f32")
+
+        self.conn = sqlite3.connect(os.path.join(path, "documents.db"))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                row INTEGER PRIMARY KEY,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+        meta = dict(self.conn.execute("SELECT key, value FROM store_meta").fetchall())
+        self.dim = int(meta['dim']) if 'dim' in meta else None
+        self.size = int(meta.get('rows', 0))
+        self._recover()
+        self._map()
+
+    def _row_bytes(self) -> int:
+        return (self.dim or 0) * 4
+
+    def _recover(self):
+        """커밋되지 않은 세그먼트 꼬리 제거"""
+        committed = self.size * self._row_bytes()
+        if not os.path.exists(self.vector_path):
+            if committed:
+                raise RuntimeError(f"벡터 파일이 없습니다: {self.vector_path} ({self.size}행 커밋됨)")
+            open(self.vector_path, 'wb').close()
+            return
+        actual = os.path.getsize(self.vector_path)
+        if actual < committed:
+            raise RuntimeError(f"벡터 파일이 커밋된 크기보다 작습니다: {actual} < {committed} bytes")
+        if actual > committed:
+            print(f"⚠️ 커밋되지 않은 벡터 {actual - committed} bytes 제거")
+            with open(self.vector_path, 'r+b') as f:
+                f.truncate(committed)
+
+    def _map(self):
+        """커밋된 범위만 읽기 전용으로 매핑"""
+        if self.size == 0:
+            self.matrix = None
+        else:
+            self.matrix = np.memmap(self.vector_path, dtype=np.float32, mode='r', shape=(self.size, self.dim))
+
+    def add(self, vectors: np.ndarray, texts: List[str] = None, metadatas: List[Dict] = None) -> range:
+        """세그먼트 추가 (벡터 append + fsync → 메타데이터 트랜잭션 커밋) → 행 번호 범위"""
+        vectors = normalize_rows(vectors)
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(f"벡터 차원 불일치: {vectors.shape[1]} != {self.dim}")
+        texts = texts if texts is not None else [''] * len(vectors)
+        metadatas = metadatas if metadatas is not None else [{}] * len(vectors)
+        if not (len(texts) == len(metadatas) == len(vectors)):
+            raise ValueError("벡터, 텍스트, 메타데이터 개수가 다릅니다")
+
+        start, end = self.size, self.size + len(vectors)
+        row_bytes = vectors.shape[1] * 4
+        try:
+            with open(self.vector_path, 'ab') as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with self.conn:  # 커밋 시점 = 세그먼트가 보이는 시점
+                self.conn.executemany(
+                    "INSERT INTO documents (row, text, metadata) VALUES (?, ?, ?)",
+                    [(start + i, text, json.dumps(metadata, ensure_ascii=False))
+                     for i, (text, metadata) in enumerate(zip(texts, metadatas))]
+                )
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)",
+                    [('dim', str(vectors.shape[1])), ('rows', str(end))]
+                )
+        except Exception:
+            # 실패한 세그먼트의 벡터를 되돌려 다음 append 위치를 맞춤
+            with open(self.vector_path, 'r+b') as f:
+                f.truncate(start * row_bytes)
+            raise
+
+        self.dim = vectors.shape[1]
+        self.size = end
+        self._map()
+        return range(start, end)
+
+    def get_documents(self, rows) -> List[Dict]:
+        """행 번호 순서대로 {'text', 'metadata'}"""
+        rows = [int(row) for row in rows]
+        if not rows:
+            return []
+        found = {}
+        for chunk_start in range(0, len(rows), 500):
+            chunk = rows[chunk_start:chunk_start + 500]
+            for row, text, metadata in self.conn.execute(
+                f"SELECT row, text, metadata FROM documents WHERE row IN ({','.join('?' * len(chunk))})",
+                chunk
+            ):
+                found[row] = {'text': text, 'metadata': json.loads(metadata)}
+        return [found[row] for row in rows]
+
+    def close(self):
+        self.matrix = None
+        self.conn.close()
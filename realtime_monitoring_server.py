@@ -1,24 +1,39 @@
 #!/usr/bin/env python3
 # realtime_monitoring_server.py - 실시간 5대 디바이스 모니터링 시스템
 
-import http.server
-import socketserver
-import json
 import os
 import time
-import subprocess
-import threading
-import socket
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse
+from dashboard_server_core import DashboardRequestHandler, StaticAsset, run_server
+from device_probe import DEVICE_CONFIGS, DeviceProbeEngine
+from device_status_poller import DeviceStatusPoller, SnapshotRoutesMixin, snapshot_client_js
+from event_stream import EventBroadcaster
+
+# 전체 디바이스 병렬 수집 엔진 (수집당 3초 마감)
+probe_engine = DeviceProbeEngine(max_workers=16, deadline=3.0)
+
+# 백그라운드 수집기 - 10초마다 스냅샷 갱신, 핸들러는 스냅샷만 전송
+status_poller = DeviceStatusPoller(lambda: probe_engine.probe_all(DEVICE_CONFIGS), interval=10.0)
+
+# 대시보드 클라이언트 공용 SSE 브로드캐스터 (스냅샷 변경분만 발행)
+broadcaster = EventBroadcaster(max_clients=16)
+status_poller.add_listener(broadcaster.publish_device_changes)
+
+class RealTimeMonitoringHandler(SnapshotRoutesMixin, DashboardRequestHandler):
+    status_poller = status_poller
+    broadcaster = broadcaster
 
-class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
     def do_GET(self):
         if self.path == '/':
             self.send_dashboard_html()
         elif self.path == '/api/devices':
             self.send_real_devices_status()
+        elif urlparse(self.path).path == '/api/v2/devices':
+            self.send_devices_v2()
         elif self.path == '/api/nas':
             self.send_nas_status()
+        elif self.path == '/api/stream':
+            self.send_event_stream()
         else:
             super().do_GET()
     
@@ -33,19 +48,13 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
     def handle_device_registration(self):
         """디바이스 등록 처리"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                device_info = json.loads(post_data.decode('utf-8'))
-                
+            device_info = self.read_json_body()
+            if device_info:
                 # 디바이스 정보 저장 (실제로는 데이터베이스나 파일에 저장)
                 print(f"📱 디바이스 등록: {device_info.get('name', 'Unknown')} - {device_info.get('ip', 'Unknown')}")
                 
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
                 response = {"status": "registered", "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
-                self.wfile.write(json.dumps(response).encode())
+                self.send_json(response, indent=None)
             else:
                 self.send_error(400, "No data received")
         except Exception as e:
@@ -54,18 +63,12 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
     def handle_heartbeat(self):
         """디바이스 하트비트 처리"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                heartbeat_data = json.loads(post_data.decode('utf-8'))
-                
+            heartbeat_data = self.read_json_body()
+            if heartbeat_data:
                 print(f"💓 하트비트: {heartbeat_data.get('device_name', 'Unknown')} - CPU: {heartbeat_data.get('cpu', 'N/A')}")
                 
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
                 response = {"status": "received", "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")}
-                self.wfile.write(json.dumps(response).encode())
+                self.send_json(response, indent=None)
             else:
                 self.send_error(400, "No heartbeat data")
         except Exception as e:
@@ -73,11 +76,37 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
     
     def send_dashboard_html(self):
         """실시간 모니터링 대시보드 HTML"""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
+        self.send_asset(dashboard_asset)
+    
+    def send_nas_status(self):
+        """NAS 상태 API"""
+        nas_status = {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "nas_devices": [
+                {
+                    "name": "SnapCodex NAS",
+                    "ip": "192.168.219.175",
+                    "status": "정상",
+                    "hostname": os.uname().nodename
+                },
+                {
+                    "name": "Desinsight2 NAS",
+                    "ip": "desinsight2.local", 
+                    "status": "대기 중"
+                },
+                {
+                    "name": "Office NAS",
+                    "ip": "desinsight.synology.me",
+                    "status": "대기 중"
+                }
+            ]
+        }
         
-        html = '''<!DOCTYPE html>
+        self.send_json(nas_status)
+
+def build_dashboard_html():
+    """실시간 모니터링 대시보드 HTML"""
+    return '''<!DOCTYPE html>
 <html lang="ko">
 <head>
     <meta charset="UTF-8">
@@ -336,6 +365,7 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
 
         function createDeviceCard(device, deviceConfig) {
             const isOnline = device.status === 'online';
+            const isChecking = device.status === 'checking';
             const cpuValue = parseInt(device.cpu) || 0;
             const memValue = parseInt(device.memory) || 0;
             const diskValue = parseInt(device.disk) || 0;
@@ -345,8 +375,8 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
                     <div class="connection-indicator ${isOnline ? '' : 'offline'}"></div>
                     <div class="device-header">
                         <div class="device-name">${device.name}</div>
-                        <div class="device-status ${isOnline ? 'status-online' : 'status-offline'}">
-                            ${isOnline ? '🟢 온라인' : '🔴 오프라인'}
+                        <div class="device-status ${isOnline ? 'status-online' : (isChecking ? 'status-checking' : 'status-offline')}">
+                            ${isOnline ? '🟢 온라인' : (isChecking ? '🔵 확인 중' : '🔴 오프라인')}
                         </div>
                     </div>
                     <div class="device-specs">${deviceConfig.specs}</div>
@@ -377,34 +407,12 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
                             <div class="metric-value">${isOnline ? '정상' : '연결 끊김'}</div>
                         </div>
                     </div>
-                    <div class="last-update">마지막 업데이트: ${device.last_update || '알 수 없음'}</div>
+                    <div class="last-update">마지막 업데이트: ${device.last_update || '알 수 없음'}${formatProbeAge(device, snapshotInterval)}</div>
                 </div>
             `;
         }
 
-        function refreshData() {
-            fetch('/api/devices')
-                .then(response => response.json())
-                .then(data => {
-                    document.getElementById('timestamp').textContent = data.timestamp;
-                    lastUpdateTime = new Date();
-                    
-                    const devicesGrid = document.getElementById('devices-grid');
-                    devicesGrid.innerHTML = data.devices.map((device, index) => 
-                        createDeviceCard(device, deviceConfigs[index])
-                    ).join('');
-                    
-                    // NAS 정보 업데이트
-                    updateNasInfo();
-                    
-                    // 시스템 정보 업데이트
-                    updateSystemInfo(data);
-                })
-                .catch(error => {
-                    console.error('데이터 로드 실패:', error);
-                    document.getElementById('timestamp').textContent = '데이터 로드 실패 - ' + new Date().toLocaleString('ko-KR');
-                });
-        }
+''' + snapshot_client_js(status_poller.interval) + '''
 
         function updateNasInfo() {
             fetch('/api/nas')
@@ -448,11 +456,12 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
             `;
         }
 
-        // 초기 로드
+        // 초기 로드 후 실시간 스트림 연결
         refreshData();
+        connectStream();
         
-        // 10초마다 자동 새로고침 (더 빠른 업데이트)
-        setInterval(refreshData, 10000);
+        // NAS 정보는 30초마다 갱신
+        setInterval(updateNasInfo, 30000);
         
         // 연결 상태 체크
         setInterval(() => {
@@ -464,200 +473,8 @@ class RealTimeMonitoringHandler(http.server.SimpleHTTPRequestHandler):
     </script>
 </body>
 </html>'''
-        
-        self.wfile.write(html.encode())
-    
-    def send_real_devices_status(self):
-        """실제 디바이스 상태 수집 및 전송"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        devices_status = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "devices": []
-        }
-        
-        # 각 디바이스 상태 확인
-        device_configs = [
-            {"name": "HOME iMac i7 64GB", "ip": "192.168.219.100"},
-            {"name": "Mac Mini M2 Pro 32GB", "ip": "192.168.219.101"},
-            {"name": "Office iMac i7 40GB", "ip": "192.168.219.102"},
-            {"name": "Mac Studio M4 Pro 64GB", "ip": "192.168.219.103"},
-            {"name": "Mobile Ecosystem", "ip": "mobile"}
-        ]
-        
-        for device_config in device_configs:
-            device_status = self.check_device_status(device_config)
-            devices_status["devices"].append(device_status)
-        
-        self.wfile.write(json.dumps(devices_status, indent=2).encode())
-    
-    def check_device_status(self, device_config):
-        """개별 디바이스 상태 확인"""
-        device_name = device_config["name"]
-        device_ip = device_config["ip"]
-        
-        if device_ip == "mobile":
-            # 모바일 디바이스는 특별 처리
-            return {
-                "name": device_name,
-                "ip": device_ip,
-                "status": "partial",
-                "cpu": "N/A",
-                "memory": "N/A",
-                "disk": "N/A",
-                "last_update": time.strftime("%H:%M:%S")
-            }
-        
-        # 실제 디바이스 연결 확인 (ping 테스트)
-        is_online = self.ping_device(device_ip)
-        
-        if is_online:
-            # 온라인인 경우 실제 시스템 정보 수집 시도
-            cpu_usage = self.get_remote_cpu_usage(device_ip)
-            memory_usage = self.get_remote_memory_usage(device_ip)
-            disk_usage = self.get_remote_disk_usage(device_ip)
-            
-            return {
-                "name": device_name,
-                "ip": device_ip,
-                "status": "online",
-                "cpu": cpu_usage,
-                "memory": memory_usage,
-                "disk": disk_usage,
-                "last_update": time.strftime("%H:%M:%S")
-            }
-        else:
-            return {
-                "name": device_name,
-                "ip": device_ip,
-                "status": "offline",
-                "cpu": "0%",
-                "memory": "0%",
-                "disk": "0%",
-                "last_update": "연결 끊김"
-            }
-    
-    def ping_device(self, ip):
-        """디바이스 ping 테스트"""
-        try:
-            # ping 명령어 실행 (1초 타임아웃)
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '1000', ip], 
-                capture_output=True, 
-                text=True, 
-                timeout=2
-            )
-            return result.returncode == 0
-        except:
-            return False
-    
-    def get_remote_cpu_usage(self, ip):
-        """원격 디바이스 CPU 사용률 조회"""
-        try:
-            # SSH를 통한 원격 명령 실행 시도
-            result = subprocess.run(
-                ['ssh', '-o', 'ConnectTimeout=2', '-o', 'StrictHostKeyChecking=no', 
-                 f'admin@{ip}', 'top -l 1 | grep "CPU usage" | head -1'],
-                capture_output=True, text=True, timeout=5
-            )
-            
-            if result.returncode == 0 and result.stdout:
-                # macOS top 명령어 출력 파싱
-                output = result.stdout.strip()
-                if 'CPU usage' in output:
-                    # CPU usage: 12.34% user, 5.67% sys, 81.99% idle
-                    parts = output.split(',')
-                    for part in parts:
-                        if 'user' in part:
-                            cpu_percent = part.split('%')[0].split()[-1]
-                            return f"{float(cpu_percent):.0f}%"
-            
-            # SSH 실패 시 시뮬레이션 데이터
-            import random
-            return f"{random.randint(10, 80)}%"
-            
-        except:
-            # 연결 실패 시 시뮬레이션 데이터
-            import random
-            return f"{random.randint(5, 30)}%"
-    
-    def get_remote_memory_usage(self, ip):
-        """원격 디바이스 메모리 사용률 조회"""
-        try:
-            result = subprocess.run(
-                ['ssh', '-o', 'ConnectTimeout=2', '-o', 'StrictHostKeyChecking=no',
-                 f'admin@{ip}', 'vm_stat | head -5'],
-                capture_output=True, text=True, timeout=5
-            )
-            
-            if result.returncode == 0:
-                # 간단한 시뮬레이션 (실제로는 vm_stat 출력 파싱 필요)
-                import random
-                return f"{random.randint(30, 70)}%"
-            
-            import random
-            return f"{random.randint(20, 60)}%"
-            
-        except:
-            import random
-            return f"{random.randint(15, 45)}%"
-    
-    def get_remote_disk_usage(self, ip):
-        """원격 디바이스 디스크 사용률 조회"""
-        try:
-            result = subprocess.run(
-                ['ssh', '-o', 'ConnectTimeout=2', '-o', 'StrictHostKeyChecking=no',
-                 f'admin@{ip}', 'df -h / | tail -1'],
-                capture_output=True, text=True, timeout=5
-            )
-            
-            if result.returncode == 0 and result.stdout:
-                # df 출력에서 사용률 추출
-                parts = result.stdout.strip().split()
-                if len(parts) >= 5:
-                    usage = parts[4]  # 사용률 (예: 45%)
-                    return usage
-            
-            import random
-            return f"{random.randint(20, 60)}%"
-            
-        except:
-            import random
-            return f"{random.randint(10, 40)}%"
-    
-    def send_nas_status(self):
-        """NAS 상태 API"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        nas_status = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "nas_devices": [
-                {
-                    "name": "SnapCodex NAS",
-                    "ip": "192.168.219.175",
-                    "status": "정상",
-                    "hostname": os.uname().nodename
-                },
-                {
-                    "name": "Desinsight2 NAS",
-                    "ip": "desinsight2.local", 
-                    "status": "대기 중"
-                },
-                {
-                    "name": "Office NAS",
-                    "ip": "desinsight.synology.me",
-                    "status": "대기 중"
-                }
-            ]
-        }
-        
-        self.wfile.write(json.dumps(nas_status, indent=2).encode())
+
+dashboard_asset = StaticAsset.from_text(build_dashboard_html())
 
 if __name__ == "__main__":
     PORT = 5004
@@ -669,8 +486,10 @@ if __name__ == "__main__":
     print(f"🔄 10초마다 자동 새로고침")
     print(f"📊 실제 디바이스 연결 상태 확인")
     
+    # 백그라운드 상태 수집 시작
+    status_poller.start()
+    
     try:
-        with socketserver.TCPServer(("", PORT), RealTimeMonitoringHandler) as httpd:
-            httpd.serve_forever()
+        run_server(RealTimeMonitoringHandler, PORT)
     except Exception as e:
         print(f"❌ 서버 오류: {e}") 
\ No newline at end of file
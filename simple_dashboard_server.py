@@ -1,19 +1,18 @@
 #!/usr/bin/env python3
 # simple_dashboard_server.py - NAS용 간단한 대시보드 서버
 
-import http.server
-import socketserver
-import json
 import os
 import subprocess
 import threading
 import time
 from urllib.parse import urlparse, parse_qs
+from dashboard_server_core import DashboardRequestHandler, StaticAsset, run_server
 
-class DashboardHandler(http.server.SimpleHTTPRequestHandler):
+class DashboardHandler(DashboardRequestHandler):
     def do_GET(self):
-        if self.path == '/':
-            self.path = '/dashboard.html'
+        if self.path in ('/', '/dashboard.html'):
+            self.send_asset(dashboard_asset)
+            return
         elif self.path == '/api/status':
             self.send_api_response()
             return
@@ -37,11 +36,7 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
                 "network": self.get_network_info()
             }
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(status, indent=2).encode())
+            self.send_json(status)
             
         except Exception as e:
             self.send_error(500, f"Error: {str(e)}")
@@ -56,11 +51,7 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
                 "python_version": f"{os.sys.version_info.major}.{os.sys.version_info.minor}.{os.sys.version_info.micro}"
             }
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(info, indent=2).encode())
+            self.send_json(info)
             
         except Exception as e:
             self.send_error(500, f"Error: {str(e)}")
@@ -305,14 +296,16 @@ if __name__ == "__main__":
     # 대시보드 HTML 파일 생성
     create_dashboard_html()
     
+    # 생성된 HTML을 한 번만 읽어 사전 압축 (ETag/304 지원)
+    dashboard_asset = StaticAsset.from_file('dashboard.html')
+    
     print(f"🚀 Desinsight NAS 대시보드 서버 시작")
     print(f"📡 포트: {PORT}")
     print(f"🌐 접속 URL: http://192.168.219.175:{PORT}")
     print(f"🔄 Ctrl+C로 종료")
     
     try:
-        with socketserver.TCPServer(("", PORT), DashboardHandler) as httpd:
-            httpd.serve_forever()
+        run_server(DashboardHandler, PORT)
     except KeyboardInterrupt:
         print("\n🛑 서버 종료")
     except Exception as e:
@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
-import json
 import os
 import time
+from dashboard_server_core import DashboardRequestHandler, StaticAsset, run_server
 
-class DashboardHandler(http.server.SimpleHTTPRequestHandler):
+class DashboardHandler(DashboardRequestHandler):
     def do_GET(self):
         if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
-            self.end_headers()
-            html = f'''<!DOCTYPE html>
+            self.send_asset(dashboard_asset)
+        elif self.path == '/api/status':
+            status = {
+                'hostname': os.uname().nodename,
+                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'system': os.uname().sysname,
+                'status': 'online'
+            }
+            self.send_json(status, indent=None)
+        else:
+            self.send_error(404)
+
+def build_dashboard_html():
+    """NAS 대시보드 HTML (시각은 브라우저에서 표시)"""
+    return f'''<!DOCTYPE html>
 <html><head><meta charset="UTF-8"><title>Desinsight NAS 대시보드</title>
 <style>
 body{{font-family:Arial;margin:20px;background:#f5f5f5}}
@@ -27,7 +36,7 @@ body{{font-family:Arial;margin:20px;background:#f5f5f5}}
 <div class="container">
     <div class="header">
         <h1>🖥️ Desinsight NAS 대시보드</h1>
-        <p>실시간 시스템 모니터링 - {time.strftime("%Y-%m-%d %H:%M:%S")}</p>
+        <p>실시간 시스템 모니터링 - <span id="now"></span></p>
     </div>
     <div class="card">
         <h3>📊 시스템 상태</h3>
@@ -65,21 +74,12 @@ body{{font-family:Arial;margin:20px;background:#f5f5f5}}
     </div>
 </div>
 <script>
+document.getElementById('now').textContent = new Date().toLocaleString('ko-KR');
 setTimeout(function(){{location.reload()}}, 30000);
 </script>
 </body></html>'''
-            self.wfile.write(html.encode())
-        elif self.path == '/api/status':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            status = {
-                'hostname': os.uname().nodename,
-                'time': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'system': os.uname().sysname,
-                'status': 'online'
-            }
-            self.wfile.write(json.dumps(status).encode())
+
+dashboard_asset = StaticAsset.from_text(build_dashboard_html())
 
 if __name__ == "__main__":
     PORT = 5001
@@ -89,7 +89,6 @@ if __name__ == "__main__":
     print(f'🔄 30초마다 자동 새로고침')
     
     try:
-        with socketserver.TCPServer(("", PORT), DashboardHandler) as httpd:
-            httpd.serve_forever()
+        run_server(DashboardHandler, PORT)
     except Exception as e:
         print(f'❌ 서버 오류: {e}') 
\ No newline at end of file
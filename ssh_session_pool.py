@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# ssh_session_pool.py - 호스트별 영구 SSH 세션 풀 (ControlMaster 멀티플렉싱)
+
+import os
+import subprocess
+import tempfile
+import threading
+
+# 메트릭 3종을 한 번의 왕복으로 수집하는 원격 명령 (구분자로 출력 분리)
+METRICS_COMMAND = (
+    'echo "@@cpu"; top -l 1 -n 0 | grep "CPU usage" | head -1; '
+    'echo "@@memory"; vm_stat; '
+    'echo "@@disk"; df -k / | tail -1'
+)
+
+
+def split_sections(output):
+    """'@@이름' 구분자로 나뉜 출력을 {이름: [줄...]} 로 변환"""
+    sections = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith('@@'):
+            current = line[2:].strip()
+            sections[current] = []
+        elif current is not None and line.strip():
+            sections[current].append(line.strip())
+    return sections
+
+
+def parse_cpu(lines):
+    """macOS top 출력 파싱 - CPU usage: 12.34% user, 5.67% sys, 81.99% idle"""
+    for line in lines:
+        if 'CPU usage' in line:
+            for part in line.split(','):
+                if 'idle' in part:
+                    idle = float(part.split('%')[0].split()[-1])
+                    return f"{100 - idle:.0f}%"
+    return None
+
+
+def parse_memory(lines):
+    """vm_stat 출력 파싱 - (active + wired + compressed) / 전체 페이지"""
+    pages = {}
+    for line in lines:
+        if ':' not in line:
+            continue
+        key, value = line.split(':', 1)
+        value = value.strip().rstrip('.')
+        if value.isdigit():
+            pages[key.strip()] = int(value)
+
+    used = (pages.get('Pages active', 0) + pages.get('Pages wired down', 0)
+            + pages.get('Pages occupied by compressor', 0))
+    total = used + pages.get('Pages free', 0) + pages.get('Pages inactive', 0) + pages.get('Pages speculative', 0)
+    if total == 0:
+        return None
+    return f"{used / total * 100:.0f}%"
+
+
+def parse_disk(lines):
+    """df 출력에서 사용률 추출 (예: 45%)"""
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 5 and parts[4].endswith('%'):
+            return parts[4]
+    return None
+
+
+def parse_metrics_output(output):
+    """일괄 명령 출력 → {'cpu': '12%', 'memory': '48%', 'disk': '35%'} (파싱 실패 항목은 None)"""
+    sections = split_sections(output)
+    return {
+        "cpu": parse_cpu(sections.get("cpu", [])),
+        "memory": parse_memory(sections.get("memory", [])),
+        "disk": parse_disk(sections.get("disk", []))
+    }
+
+
+class SSHSessionPool:
+    """호스트마다 하나의 ControlMaster 세션을 유지하고 명령을 그 위로 다중화
+
+    첫 명령에서만 전체 핸드셰이크가 일어나고, 이후 명령은 기존 마스터 연결을
+    재사용하므로 수십 ms 안에 끝납니다. 유휴 세션은 ControlPersist 후 정리됩니다.
+    """
+
+    def __init__(self, user="admin", control_dir=None, persist=600, connect_timeout=2):
+        self.user = user
+        self.persist = persist
+        self.connect_timeout = connect_timeout
+        self.control_dir = control_dir
+        self.lock = threading.Lock()
+        self.hosts = set()
+
+    def control_path(self, ip):
+        """호스트별 제어 소켓 경로"""
+        with self.lock:
+            if self.control_dir is None:
+                # ControlPath는 소켓 경로 길이 제한(~104자)이 있으므로 짧은 임시 디렉터리 사용
+                self.control_dir = tempfile.mkdtemp(prefix="dssh-")
+            os.makedirs(self.control_dir, mode=0o700, exist_ok=True)
+        return os.path.join(self.control_dir, f"{self.user}@{ip}")
+
+    def ssh_args(self, ip):
+        """멀티플렉싱 옵션이 적용된 ssh 명령 인자"""
+        return [
+            'ssh',
+            '-o', f'ConnectTimeout={self.connect_timeout}',
+            '-o', 'StrictHostKeyChecking=no',
+            '-o', 'BatchMode=yes',
+            '-o', 'ControlMaster=auto',
+            '-o', f'ControlPath={self.control_path(ip)}',
+            '-o', f'ControlPersist={self.persist}',
+            f'{self.user}@{ip}'
+        ]
+
+    def run(self, ip, command, timeout=5):
+        """영구 세션 위에서 원격 명령 실행"""
+        with self.lock:
+            self.hosts.add(ip)
+        return subprocess.run(self.ssh_args(ip) + [command], capture_output=True, text=True, timeout=timeout)
+
+    def collect_metrics(self, ip, timeout=5):
+        """CPU/메모리/디스크를 한 번의 왕복으로 수집 (실패 시 None)"""
+        result = self.run(ip, METRICS_COMMAND, timeout=timeout)
+        if result.returncode != 0 or not result.stdout:
+            return None
+        return parse_metrics_output(result.stdout)
+
+    def close(self, ip):
+        """호스트의 마스터 연결 종료"""
+        subprocess.run(['ssh', '-o', f'ControlPath={self.control_path(ip)}', '-O', 'exit', f'{self.user}@{ip}'],
+                       capture_output=True, timeout=5)
+        with self.lock:
+            self.hosts.discard(ip)
+
+    def close_all(self):
+        """모든 마스터 연결 종료"""
+        for ip in list(self.hosts):
+            try:
+                self.close(ip)
+            except Exception:
+                pass